@@ -0,0 +1,68 @@
+"""This benchmark measures how long the event loop is blocked while a huge
+json response, like a leaderboard, is decoded. It compares decoding the
+body on the loop in one go (what happens when http_decode_threshold is not
+set) with decoding it incrementally (what happens for bodies above the
+threshold).
+
+Run it with: python examples/benchmarks/decode_lag.py [size in mb]
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from fortnitepy import codec
+from fortnitepy.transport import loads_incrementally
+from fortnitepy.utils import LoopLagMonitor
+
+
+def create_body(size: int) -> bytes:
+    entry = {
+        "accountId": "0" * 32,
+        "value": 1234,
+        "rank": 1,
+        "displayNames": {"epic": "SomeDisplayName"},
+        "stats": {"kills": 10, "wins": 2, "matchesplayed": 30},
+    }
+    entry_size = len(json.dumps(entry))
+    entries = [dict(entry, rank=i) for i in range(size // entry_size)]
+    return json.dumps({"entries": entries, "page": 0}).encode("utf-8")
+
+
+async def run(name: str, decode, body: bytes) -> None:
+    monitor = LoopLagMonitor(interval=0.001, max_samples=100000)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    monitor.samples.clear()
+
+    started_at = time.perf_counter()
+    await decode(body)
+    elapsed = time.perf_counter() - started_at
+
+    await asyncio.sleep(0.05)
+    monitor.stop()
+
+    stats = monitor.get_stats()
+    print(
+        "{0:<14} decode: {1:.3f}s  max lag: {2:.3f}s  p99 lag: {3:.3f}s".format(
+            name, elapsed, stats["max"], stats["p99"]
+        )
+    )
+
+
+async def inline(body: bytes) -> None:
+    codec.loads(body)
+
+
+async def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 44
+    body = create_body(size * 1024 * 1024)
+    print("Body size: {0:.1f} MB".format(len(body) / 1024 / 1024))
+
+    await run("inline", inline, body)
+    await run("incremental", loads_incrementally, body)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""This benchmark measures how long EventDispatcher takes to drop or decode
+XMPP notification bodies. It compares decoding every body before looking
+up its handlers (the baseline) with the type pre-scan of
+EventDispatcher.is_unhandled(), which drops bodies nobody handles without
+decoding them. Handled bodies are still decoded after the pre-scan, so its
+own cost is shown too.
+
+Run it with: python examples/benchmarks/event_dropping.py [recorded stream]
+"""
+
+import sys
+import timeit
+
+from types import SimpleNamespace
+
+from fortnitepy import codec
+from fortnitepy.xmpp import EventDispatcher
+
+from payloads import load_stream
+
+REPEAT = 10
+
+client = SimpleNamespace(
+    xmpp=SimpleNamespace(dispatcher=SimpleNamespace(listeners={}))
+)
+
+
+def baseline(stream):
+    for raw in stream:
+        body = codec.loads(raw)
+        EventDispatcher.has_handler(client, body.get("type"))
+
+
+def prescan_only(stream):
+    for raw in stream:
+        EventDispatcher.is_unhandled(client, raw)
+
+
+def prescan(stream):
+    for raw in stream:
+        if EventDispatcher.is_unhandled(client, raw):
+            continue
+        body = codec.loads(raw)
+        EventDispatcher.has_handler(client, body.get("type"))
+
+
+def measure(func, stream):
+    if not stream:
+        return 0.0
+
+    timer = timeit.Timer(lambda: func(stream))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number / len(stream)
+
+
+def main():
+    stream = load_stream(sys.argv[1] if len(sys.argv) > 1 else None)
+    unhandled = [raw for raw in stream if EventDispatcher.is_unhandled(client, raw)]
+    handled = [raw for raw in stream if raw not in unhandled]
+    print(
+        "{0} events, {1} handled and {2} unhandled".format(
+            len(stream), len(handled), len(unhandled)
+        )
+    )
+
+    for name, bodies in (
+        ("handled", handled),
+        ("unhandled", unhandled),
+        ("whole stream", stream),
+    ):
+        old = measure(baseline, bodies)
+        scan = measure(prescan_only, bodies)
+        new = measure(prescan, bodies)
+        change = new / old - 1 if old else 0.0
+        print(
+            "{0:<13} baseline: {1:6.2f}us  with pre-scan: {2:6.2f}us ({3:+.0%})  "
+            "pre-scan alone: {4:5.2f}us".format(
+                name, old * 1e6, new * 1e6, change, scan * 1e6
+            )
+        )
+
+if __name__ == "__main__":
+    main()
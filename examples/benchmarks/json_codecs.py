@@ -0,0 +1,83 @@
+"""This benchmark compares the json codecs that can be passed to
+fortnitepy.set_json_codec() on XMPP notification and presence payloads.
+
+For every event the body is decoded (what EventDispatcher.process_event
+does) together with every ``_j`` meta value in it (what MetaBase.get_prop
+does). For presences the status is decoded (what process_presence does)
+and encoded again (what XMPPClient.set_presence does).
+
+Run it with: python examples/benchmarks/json_codecs.py [recorded stream]
+"""
+
+import sys
+import timeit
+
+from fortnitepy.codec import JSONCodec, OrjsonCodec, UJSONCodec
+
+from payloads import load_stream, sample_presences
+
+REPEAT = 5
+
+
+def get_codecs():
+    codecs = [JSONCodec()]
+    for cls in (OrjsonCodec, UJSONCodec):
+        try:
+            codecs.append(cls())
+        except ImportError:
+            print("Skipping {0}, it is not installed.".format(cls.name))
+    return codecs
+
+
+def process_events(codec, stream):
+    loads = codec.loads
+    for raw in stream:
+        body = loads(raw)
+        meta = body.get("member_state_updated") or body.get("party_state_updated")
+        if meta:
+            for key, value in meta.items():
+                if key.endswith("_j"):
+                    loads(value)
+
+
+def process_presences(codec, presences):
+    for raw in presences:
+        codec.dumps(codec.loads(raw))
+
+
+def measure(func, *args):
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def main():
+    stream = load_stream(sys.argv[1] if len(sys.argv) > 1 else None)
+    presences = sample_presences()
+    print(
+        "{0} events ({1:.1f} KB), {2} presences".format(
+            len(stream), sum(len(raw) for raw in stream) / 1024, len(presences)
+        )
+    )
+
+    baseline = None
+    for codec in get_codecs():
+        events = measure(process_events, codec, stream) / len(stream)
+        presence = measure(process_presences, codec, presences) / len(presences)
+        if baseline is None:
+            baseline = (events, presence)
+
+        print(
+            "{0:<8} per event: {1:6.2f}us ({2:+.0%})  "
+            "per presence: {3:6.2f}us ({4:+.0%})".format(
+                codec.name,
+                events * 1e6,
+                events / baseline[0] - 1,
+                presence * 1e6,
+                presence / baseline[1] - 1,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""XMPP payloads used by the benchmarks in this folder.
+
+The sample stream mirrors the notifications a bot receives while sitting in
+a party with a few members: mostly member meta updates, some party updates
+and friend notifications. Epic still sends the legacy FRIENDSHIP_REQUEST
+and USER_BLOCKLIST_UPDATE notifications next to the ones fortnitepy
+handles, so those make up the unhandled part of the stream.
+
+A recorded stream can be used instead by passing a file with one raw
+message body per line, e.g. collected from the ``RECV`` debug logs of
+``fortnitepy.xmpp``.
+"""
+
+import json
+
+PARTY_ID = "6a4d1e2ab62b4a2e9d4c0f3f6b3e8a11"
+ACCOUNT_IDS = [
+    "4735ce9132924caf8a5b17789b40f79c",
+    "9a1c1a5e0a4d4e19a1ff3b2cdd1f8a42",
+    "c2f3e1b0a9d84f7e8b6a5c4d3e2f1a0b",
+]
+SENT = "2021-06-12T18:25:43.511Z"
+
+
+def _j(key, value):
+    return json.dumps({key: value})
+
+
+def member_meta(index):
+    character = "CID_{0:03d}_Athena_Commando_F".format(index)
+    return {
+        "Default:Location_s": "PreLobby",
+        "Default:LobbyState_j": _j(
+            "LobbyState",
+            {
+                "inGameReadyCheckStatus": None,
+                "gameReadiness": "NotReady",
+                "readyInputType": "MouseAndKeyboard",
+                "currentInputType": "MouseAndKeyboard",
+                "hiddenMatchmakingDelayMax": 0,
+                "hasPreloadedAthena": False,
+            },
+        ),
+        "Default:FrontendEmote_j": _j(
+            "FrontendEmote",
+            {
+                "emoteItemDef": "None",
+                "emoteItemDefEncryptionKey": "",
+                "emoteSection": -1,
+            },
+        ),
+        "Default:AthenaCosmeticLoadout_j": _j(
+            "AthenaCosmeticLoadout",
+            {
+                "characterDef": (
+                    "AthenaCharacterItemDefinition'/Game/Athena/Items/Cosmetics/"
+                    "Characters/{0}.{0}'".format(character)
+                ),
+                "characterEKey": "",
+                "backpackDef": "None",
+                "backpackEKey": "",
+                "pickaxeDef": (
+                    "AthenaPickaxeItemDefinition'/Game/Athena/Items/Cosmetics/"
+                    "Pickaxes/DefaultPickaxe.DefaultPickaxe'"
+                ),
+                "pickaxeEKey": "",
+                "contrailDef": "None",
+                "contrailEKey": "",
+                "scratchpad": [],
+            },
+        ),
+        "Default:AthenaCosmeticLoadoutVariants_j": _j(
+            "AthenaCosmeticLoadoutVariants",
+            {"vL": {"athenaCharacter": {"i": [{"c": "Material", "v": "Mat2"}]}}},
+        ),
+        "Default:AthenaBannerInfo_j": _j(
+            "AthenaBannerInfo",
+            {
+                "bannerIconId": "standardbanner15",
+                "bannerColorId": "defaultcolor15",
+                "seasonLevel": 100 + index,
+            },
+        ),
+        "Default:BattlePassInfo_j": _j(
+            "BattlePassInfo",
+            {
+                "bHasPurchasedPass": True,
+                "passLevel": 100 + index,
+                "selfBoostXp": 0,
+                "friendBoostXp": 0,
+            },
+        ),
+        "Default:MemberSquadAssignmentRequest_j": _j(
+            "MemberSquadAssignmentRequest",
+            {
+                "startingAbsoluteIdx": -1,
+                "targetAbsoluteIdx": -1,
+                "swapTargetMemberId": "INVALID",
+                "version": index,
+            },
+        ),
+        "Default:PlatformData_j": _j(
+            "PlatformData",
+            {
+                "platform": {
+                    "platformDescription": {
+                        "name": "WIN",
+                        "platformType": "DESKTOP",
+                        "onlineSubsystem": "None",
+                        "sessionType": "",
+                        "externalAccountType": "",
+                        "crossplayPool": "DESKTOP",
+                    },
+                },
+                "uniqueId": "INVALID",
+                "sessionId": "",
+            },
+        ),
+    }
+
+
+def party_meta(revision):
+    return {
+        "Default:PartyState_s": "BattleRoyaleView",
+        "Default:PlaylistData_j": _j(
+            "PlaylistData",
+            {
+                "playlistName": "Playlist_DefaultSquad",
+                "tournamentId": "",
+                "eventWindowId": "",
+                "regionId": "EU",
+            },
+        ),
+        "Default:RawSquadAssignments_j": _j(
+            "RawSquadAssignments",
+            [
+                {"memberId": account_id, "absoluteMemberIdx": i}
+                for i, account_id in enumerate(ACCOUNT_IDS)
+            ],
+        ),
+        "Default:PrivacySettings_j": _j(
+            "PrivacySettings",
+            {
+                "partyType": "Public",
+                "partyInviteRestriction": "AnyMember",
+                "bOnlyLeaderFriendsCanJoin": False,
+            },
+        ),
+        "Default:SquadFill_b": "true",
+        "Default:ActivityName_s": "",
+        "Default:CurrentRegionId_s": "EU",
+        "Default:ZoneTileIndex_U": str(revision),
+    }
+
+
+def member_state_updated(index, revision):
+    return {
+        "sent": SENT,
+        "type": "com.epicgames.social.party.notification.v0.MEMBER_STATE_UPDATED",
+        "revision": revision,
+        "ns": "Fortnite",
+        "party_id": PARTY_ID,
+        "account_id": ACCOUNT_IDS[index],
+        "account_dn": "Member{0}".format(index),
+        "member_state_removed": [],
+        "member_state_updated": member_meta(index),
+        "joined_at": SENT,
+        "updated_at": SENT,
+    }
+
+
+def party_updated(revision):
+    return {
+        "sent": SENT,
+        "type": "com.epicgames.social.party.notification.v0.PARTY_UPDATED",
+        "revision": revision,
+        "ns": "Fortnite",
+        "party_id": PARTY_ID,
+        "captain_id": ACCOUNT_IDS[0],
+        "party_state_removed": [],
+        "party_state_updated": party_meta(revision),
+        "party_privacy_type": "PUBLIC",
+        "party_type": "DEFAULT",
+        "party_sub_type": "default",
+        "max_number_of_members": 16,
+        "invite_ttl_seconds": 14400,
+        "created_at": SENT,
+        "updated_at": SENT,
+    }
+
+
+def friend(index):
+    return {
+        "type": "com.epicgames.friends.core.apiobjects.Friend",
+        "timestamp": SENT,
+        "payload": {
+            "accountId": ACCOUNT_IDS[index],
+            "status": "ACCEPTED",
+            "direction": "INBOUND",
+            "created": SENT,
+            "favorite": False,
+        },
+    }
+
+
+def legacy_friendship_request(index):
+    return {
+        "type": "FRIENDSHIP_REQUEST",
+        "timestamp": SENT,
+        "from": ACCOUNT_IDS[index],
+        "to": ACCOUNT_IDS[0],
+        "status": "ACCEPTED",
+    }
+
+
+def legacy_blocklist_update(index):
+    return {
+        "type": "USER_BLOCKLIST_UPDATE",
+        "timestamp": SENT,
+        "payload": {"accountId": ACCOUNT_IDS[index], "status": "BLOCKED"},
+    }
+
+
+def presence_status(index):
+    return {
+        "Status": "Battle Royale Lobby - 3 / 16",
+        "bIsPlaying": False,
+        "bIsJoinable": True,
+        "bHasVoiceSupport": False,
+        "SessionId": "",
+        "Properties": {
+            "party.joininfodata.286331153_j": {
+                "sourceId": ACCOUNT_IDS[index],
+                "sourceDisplayName": "Member{0}".format(index),
+                "sourcePlatform": "WIN",
+                "partyId": PARTY_ID,
+                "partyTypeId": 286331153,
+                "key": "k",
+                "appId": "Fortnite",
+                "buildId": "1:3:",
+                "partyFlags": -2024557306,
+                "notAcceptingReason": 0,
+                "pc": 3,
+            },
+            "FortBasicInfo_j": {
+                "homeBaseRating": 1,
+            },
+            "FortLFG_I": "0",
+            "FortPartySize_i": 3,
+            "FortSubGame_i": 1,
+            "InUnjoinableMatch_b": False,
+            "FortGameplayStats_j": {
+                "state": "",
+                "playlist": "None",
+                "numKills": 0,
+                "bFellToDeath": False,
+            },
+        },
+    }
+
+
+def sample_stream():
+    """Returns the raw bodies of the sample notification stream."""
+    stream = []
+    for revision in range(20):
+        for index in range(len(ACCOUNT_IDS)):
+            stream.append(member_state_updated(index, revision))
+        stream.append(party_updated(revision))
+
+        index = revision % len(ACCOUNT_IDS)
+        stream.append(friend(index))
+        stream.append(legacy_friendship_request(index))
+        stream.append(legacy_blocklist_update(index))
+
+    return [json.dumps(body) for body in stream]
+
+
+def sample_presences():
+    """Returns the raw status strings of the sample presences."""
+    return [json.dumps(presence_status(i)) for i in range(len(ACCOUNT_IDS))]
+
+
+def load_stream(path=None):
+    """Returns the raw bodies of the recorded stream at ``path`` or of the
+    sample stream if no path is passed.
+    """
+    if path is None:
+        return sample_stream()
+
+    with open(path, "r", encoding="utf-8") as fp:
+        return [line.strip() for line in fp if line.strip()]
@@ -0,0 +1,131 @@
+"""This benchmark compares how long it takes to build the url and headers of
+a request with the code HTTPClient used before its request building fast
+path (inlined below as the baseline) and with the current code.
+
+Run it with: python examples/benchmarks/request_building.py
+"""
+
+import timeit
+
+from types import SimpleNamespace
+from urllib.parse import quote as urllibquote
+
+from fortnitepy.http import AccountPublicService, HTTPClient
+
+ACCOUNT_ID = "4735ce9132924caf8a5b17789b40f79c"
+DISPLAY_NAME = "Some Name/With Slash"
+NUMBER = 100000
+
+
+def baseline_quote(string):
+    string = urllibquote(string)
+    string = string.replace("/", "%2F")
+    return string
+
+
+class BaselineRoute:
+    BASE = AccountPublicService.BASE
+    AUTH = AccountPublicService.AUTH
+
+    def __init__(self, path="", **params):
+        self.path = path
+        self.params = {
+            k: (baseline_quote(v) if isinstance(v, str) else v)
+            for k, v in params.items()
+        }
+
+        if self.BASE == "":
+            raise ValueError("Route must have a base")
+
+        self.sanitized_url = url = self.BASE + self.path
+        self.url = url.format(**self.params) if self.params else url
+
+
+def baseline_get_auth(http, auth):
+    u_auth = auth.upper()
+
+    if u_auth == "IOS_BASIC_TOKEN":
+        return "basic {0}".format(http.client.auth.ios_token)
+    elif u_auth == "FORTNITE_BASIC_TOKEN":
+        return "basic {0}".format(http.client.auth.fortnite_token)
+    elif u_auth == "IOS_ACCESS_TOKEN":
+        return http.client.auth.ios_authorization
+    elif u_auth == "FORTNITE_ACCESS_TOKEN":
+        return http.client.auth.authorization
+    return auth
+
+
+def baseline_headers(http, auth, kwargs):
+    headers = {**kwargs.get("headers", {}), **http.headers}
+    headers["User-Agent"] = http.user_agent
+    if auth is not None:
+        headers["Authorization"] = baseline_get_auth(http, auth)
+    return headers
+
+
+def new_headers(http, auth, kwargs):
+    headers = http.get_headers(auth)
+    extra_headers = kwargs.get("headers")
+    if extra_headers:
+        headers = {**extra_headers, **headers}
+    return headers
+
+
+def create_http():
+    auth = SimpleNamespace(
+        ios_token="a" * 40,
+        fortnite_token="b" * 40,
+        ios_authorization="bearer " + "c" * 32,
+        authorization="bearer " + "d" * 32,
+    )
+    client = SimpleNamespace(
+        build="++Fortnite+Release-20.00", os="Windows/10", auth=auth
+    )
+
+    http = HTTPClient.__new__(HTTPClient)
+    http.client = client
+    http.headers = {"Accept-Language": "en-EN"}
+    http._headers_cache = {}
+    return http
+
+
+def bench(name, baseline, new):
+    old = min(timeit.repeat(baseline, number=NUMBER, repeat=5)) / NUMBER
+    cur = min(timeit.repeat(new, number=NUMBER, repeat=5)) / NUMBER
+    print(
+        "{0:<24} baseline: {1:.2f}us  new: {2:.2f}us  ({3:+.0%})".format(
+            name, old * 1e6, cur * 1e6, cur / old - 1
+        )
+    )
+
+
+def main():
+    http = create_http()
+    path = "/account/api/public/account/{user_id}"
+    search = "/account/api/public/account/displayName/{display_name}"
+
+    bench(
+        "route (id param)",
+        lambda: BaselineRoute(path, user_id=ACCOUNT_ID),
+        lambda: AccountPublicService(path, user_id=ACCOUNT_ID),
+    )
+    bench(
+        "route (quoted param)",
+        lambda: BaselineRoute(search, display_name=DISPLAY_NAME),
+        lambda: AccountPublicService(search, display_name=DISPLAY_NAME),
+    )
+    bench(
+        "headers",
+        lambda: baseline_headers(http, "FORTNITE_ACCESS_TOKEN", {}),
+        lambda: new_headers(http, "FORTNITE_ACCESS_TOKEN", {}),
+    )
+    extra = {"headers": {"Content-Type": "application/json"}}
+    bench(
+        "headers (extra headers)",
+        lambda: baseline_headers(http, "FORTNITE_ACCESS_TOKEN", extra),
+        lambda: new_headers(http, "FORTNITE_ACCESS_TOKEN", extra),
+    )
+
+
+if __name__ == "__main__":
+    main()
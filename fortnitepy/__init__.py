@@ -53,7 +53,13 @@ from .party import (
     PartyJoinRequest,
     SquadAssignment,
 )
-from .presence import Presence, PresenceGameplayStats, PresenceParty
+from .presence import (
+    Presence,
+    PresenceGameplayStats,
+    PresenceParty,
+    PresenceFilter,
+    PresenceCoalescer,
+)
 from .user import (
     ClientUser,
     User,
@@ -69,5 +75,20 @@ from .store import Store, FeaturedStoreItem, DailyStoreItem
 from .news import BattleRoyaleNewsPost
 from .playlist import Playlist
 from .avatar import Avatar
-from .http import HTTPRetryConfig, Route
+from .http import (
+    HTTPRetryConfig,
+    Route,
+    ResponseCache,
+    ConnectionPool,
+    RequestScheduler,
+    CircuitBreaker,
+    RequestHedger,
+)
+from .transport import (
+    HTTPTransport,
+    AiohttpTransport,
+    RecordReplayTransport,
+    RecordedResponse,
+)
+from .codec import JSONCodec, get_json_codec, set_json_codec
 from .utils import *
@@ -122,6 +122,8 @@ class Auth:
                     raise
 
     def _update_ios_data(self, data: dict) -> None:
+        self.client.http.clear_headers_cache()
+
         self.ios_access_token = data["access_token"]
         self.ios_expires_in = data["expires_in"]
         self.ios_expires_at = from_iso(data["expires_at"])
@@ -137,6 +139,8 @@ class Auth:
         self.ios_in_app_id = data["in_app_id"]
 
     def _update_data(self, data: dict) -> None:
+        self.client.http.clear_headers_cache()
+
         self.access_token = data["access_token"]
         self.expires_in = data["expires_in"]
         self.expires_at = from_iso(data["expires_at"])
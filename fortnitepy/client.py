@@ -66,16 +66,31 @@ from .errors import (
     PartyIsFull,
 )
 from .friend import Friend, IncomingPendingFriend, OutgoingPendingFriend
-from .http import HTTPClient
+from .http import (
+    AccountPublicService,
+    ConnectionPool,
+    FriendsPublicService,
+    HTTPClient,
+    PartyService,
+    PresencePublicService,
+)
 from .news import BattleRoyaleNewsPost
 from .party import ClientParty, DefaultPartyConfig, DefaultPartyMemberConfig, Party
 from .playlist import Playlist
-from .presence import Presence
+from .presence import Presence, PresenceCoalescer
 from .stats import StatsCollection, StatsV2, _StatsBase
 from .store import Store
 from .typedefs import DatetimeOrTimestamp, MaybeCoro, StrOrInt
 from .user import BlockedUser, ClientUser, SacSearchEntryUser, User, UserSearchEntry
-from .utils import LockEvent, MaybeLock, from_iso, is_display_name
+from .utils import (
+    EventExecutor,
+    LockEvent,
+    LoopLagMonitor,
+    MaybeLock,
+    from_iso,
+    is_display_name,
+    _id_key,
+)
 from .xmpp import XMPPClient
 
 log = logging.getLogger(__name__)
@@ -114,6 +129,83 @@ class StartContext:
         return awaiter().__await__()
 
 
+class UserBatchLoader:
+    """Collects user id lookups made within a short window and resolves
+    them with as few multi-id account requests as possible.
+    """
+
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, client: "BasicClient", window: float) -> None:
+        self.client = client
+        self.window = window
+
+        # The amount of account requests sent and the amount of lookups
+        # resolved by them.
+        self.requests = 0
+        self.lookups = 0
+
+        self._pending = {}
+        self._handle = None
+
+    def load(self, user_id: str) -> asyncio.Future:
+        try:
+            return self._pending[user_id]
+        except KeyError:
+            pass
+
+        loop = asyncio.get_running_loop()
+        future = self._pending[user_id] = loop.create_future()
+
+        if len(self._pending) >= self.MAX_BATCH_SIZE:
+            self.flush()
+        elif self._handle is None:
+            self._handle = loop.call_later(self.window, self.flush)
+
+        return future
+
+    async def load_many(self, user_ids: Iterable[str]) -> List[dict]:
+        futures = [asyncio.shield(self.load(user_id)) for user_id in user_ids]
+        results = await asyncio.gather(*futures)
+        return [data for data in results if data is not None]
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        pending, self._pending = self._pending, {}
+        user_ids = list(pending)
+
+        size = self.MAX_BATCH_SIZE
+        for chunk in (user_ids[i : i + size] for i in range(0, len(user_ids), size)):
+            asyncio.ensure_future(
+                self._resolve(chunk, [pending[user_id] for user_id in chunk])
+            )
+
+    async def _resolve(self, user_ids: List[str], futures: List[asyncio.Future]):
+        self.requests += 1
+        self.lookups += len(user_ids)
+
+        try:
+            results = await self.client.http.account_get_multiple_by_user_id(user_ids)
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        found = {}
+        for data in results:
+            found[data["id"]] = data
+            if self.client.cache_users:
+                self.client.store_user(data, try_cache=False)
+
+        for user_id, future in zip(user_ids, futures):
+            if not future.done():
+                future.set_result(found.get(user_id))
+
+
 async def _start_client(
     client: "BasicClient",
     *,
@@ -208,6 +300,7 @@ async def start_multiple(
     all_ready_callback: Optional[MaybeCoro] = None,
     before_start: Optional[Awaitable] = None,
     before_close: Optional[Awaitable] = None,
+    connection_pool: Optional[Union[bool, ConnectionPool]] = None,
 ) -> None:
     """|coro|
 
@@ -256,6 +349,11 @@ async def start_multiple(
         close. This must be a coroutine as all the clients wait to close until
         this callback is finished processing so you can do heavy close stuff
         like closing database connections, sessions etc.
+    connection_pool: Optional[Union[:class:`bool`, :class:`ConnectionPool`]]
+        The connection pool the clients should share instead of each client
+        opening its own connections. If ``True``, a pool with default limits
+        is created and closed once all clients are closed. Defaults to
+        ``None`` which means connections are not shared.
 
     Raises
     ------
@@ -312,6 +410,21 @@ async def start_multiple(
 
     await asyncio.gather(*[client.init() for client in clients])
 
+    if connection_pool is not None and connection_pool is not False:
+        if connection_pool is True:
+            connection_pool = ConnectionPool()
+
+            async def pool_closer():
+                await asyncio.gather(
+                    *[client.wait_until_closed() for client in clients]
+                )
+                await connection_pool.close()
+
+            asyncio.ensure_future(pool_closer())
+
+        for client in clients:
+            connection_pool.register(client)
+
     asyncio.ensure_future(all_ready_callback_runner())
 
     _before_start = _before_event(before_start)
@@ -380,6 +493,7 @@ def run_multiple(
     all_ready_callback: Optional[MaybeCoro] = None,
     before_start: Optional[Awaitable] = None,
     before_close: Optional[Awaitable] = None,
+    connection_pool: Optional[Union[bool, ConnectionPool]] = None,
 ) -> None:
     """This function sets up a loop and then calls :func:`start_multiple()`
     for you. If you already have a running event loop, you should start
@@ -429,6 +543,11 @@ def run_multiple(
         close. This must be a coroutine as all the clients wait to close until
         this callback is finished processing so you can do heavy close stuff
         like closing database connections, sessions etc.
+    connection_pool: Optional[Union[:class:`bool`, :class:`ConnectionPool`]]
+        The connection pool the clients should share instead of each client
+        opening its own connections. If ``True``, a pool with default limits
+        is created and closed once all clients are closed. Defaults to
+        ``None`` which means connections are not shared.
 
     Raises
     ------
@@ -450,6 +569,7 @@ def run_multiple(
                 all_ready_callback=all_ready_callback,
                 before_start=before_start,
                 before_close=before_close,
+                connection_pool=connection_pool,
             )
         finally:
             await close_multiple(clients)
@@ -487,6 +607,53 @@ class BasicClient:
         The connector to use for http connection pooling.
     http_retry_config: Optional[:class:`HTTPRetryConfig`]
         The config to use for http retries.
+    http_transport: Optional[:class:`HTTPTransport`]
+        The transport used to send http requests. Pass a
+        :class:`RecordReplayTransport` to record requests to or replay them
+        from a cassette. Defaults to :class:`AiohttpTransport`.
+    http_coalesce_requests: :class:`bool`
+        Whether or not identical GET requests running at the same time
+        should share a single underlying request. The result (or
+        exception) is then passed to every caller. Defaults to ``False``.
+    http_response_cache: Union[:class:`bool`, :class:`ResponseCache`]
+        The cache to use for static content like the item shop, news and
+        playlists. If ``True``, a cache shared by all clients in the process
+        is used. Defaults to ``None`` which means responses are not cached.
+    http_graphql_batch_size: Optional[:class:`int`]
+        If set, concurrent GraphQL requests are coalesced into
+        multi-operation posts of up to this many operations. Defaults to
+        ``None`` which means every GraphQL request is posted on its own.
+    http_graphql_batch_latency: :class:`float`
+        How many seconds to wait for more GraphQL requests before a batch
+        is posted. Only used with ``http_graphql_batch_size``. Defaults to
+        ``0`` which means the batch is posted on the next iteration of the
+        event loop.
+    http_scheduler: Union[:class:`bool`, :class:`RequestScheduler`]
+        The scheduler used to limit concurrent requests per service and to
+        prioritize latency critical requests like party updates over bulk
+        requests. If ``True``, a scheduler with the default settings is used.
+        Defaults to ``None`` which means requests are not scheduled.
+    http_decode_threshold: Optional[:class:`int`]
+        Json response bodies of at least this many bytes (e.g. huge friend
+        lists or leaderboards) are decoded in small steps with the standard
+        library json module, yielding to the event loop in between, instead
+        of blocking it for the whole decode. Decoding this way takes about
+        twice as long in total. Defaults to ``None`` which means every
+        response is decoded in one go.
+    monitor_loop_lag: :class:`bool`
+        Whether to measure event loop lag while the client is running.
+        The measurements are available through :attr:`loop_lag`.
+        Defaults to ``False``.
+    http_hedging: Union[:class:`bool`, :class:`RequestHedger`]
+        The hedger used to send a second copy of slow GET requests to routes
+        that allow it, like account and presence lookups. If ``True``, a
+        hedger with the default settings is used. Defaults to ``None`` which
+        means requests are never hedged.
+    http_circuit_breaker: Union[:class:`bool`, :class:`CircuitBreaker`]
+        The circuit breaker used to fail fast with :exc:`ServiceUnavailable`
+        when a service is down instead of retrying requests to it. If
+        ``True``, a circuit breaker with the default settings is used.
+        Defaults to ``None`` which means no circuit breaker is used.
     build: :class:`str`
         The build used by Fortnite.
         Defaults to a valid but maybe outdated value.
@@ -498,15 +665,48 @@ class BasicClient:
         Whether or not the library should cache :class:`User` objects. Disable
         this if you are running a program with lots of users as this could
         potentially take a big hit on the memory usage. Defaults to ``True``.
+    prewarm_connections: :class:`bool`
+        Whether connections to the services used during startup should be
+        opened in parallel with authentication. This lowers the time it
+        takes for the client to become ready. Defaults to ``False``.
+    user_lookup_batch_window: Optional[:class:`float`]
+        If set, user id lookups (e.g. from :meth:`fetch_user()` or event
+        processing) made within this many seconds of each other are
+        resolved together with one request per 100 ids. Defaults to
+        ``None`` which means every lookup is requested on its own.
+    event_executor: Union[:class:`bool`, :class:`EventExecutor`]
+        The executor used to bound how many event handlers run at the same
+        time. If ``True``, an executor with the default settings is used.
+        Defaults to ``None`` which means every handler is run as soon as
+        its event is dispatched.
+
+        .. note::
+
+            With the ``drop_oldest`` or ``drop_newest`` policy, the futures
+            of dropped handlers returned by ``dispatch_event()`` are
+            cancelled.
 
     Attributes
     ----------
     user: :class:`ClientUser`
         The user the client is logged in as.
+    loop_lag: Optional[:class:`LoopLagMonitor`]
+        The event loop lag monitor. ``None`` unless ``monitor_loop_lag``
+        is enabled.
     """  # noqa
 
+    # The amount of display names resolved per GraphQL post and the amount
+    # of posts allowed to run concurrently.
+    DISPLAY_NAME_BATCH_SIZE = 25
+    DISPLAY_NAME_BATCH_CONCURRENCY = 4
+
     def __init__(self, auth: Auth, **kwargs: Any) -> None:
         self.cache_users = kwargs.get("cache_users", True)
+        self.prewarm_connections = kwargs.get("prewarm_connections", False)
+        if kwargs.get("monitor_loop_lag", False):
+            self.loop_lag = LoopLagMonitor()
+        else:
+            self.loop_lag = None
         self.build = kwargs.get("build", "++Fortnite+Release-14.10-CL-14288110")  # noqa
         self.os = kwargs.get("os", "Windows/10.0.17134.1.768.64bit")
 
@@ -514,15 +714,36 @@ class BasicClient:
         self.accept_eula = True
         self.event_prefix = "event_"
 
+        window = kwargs.get("user_lookup_batch_window")
+        if window is not None:
+            self._user_loader = UserBatchLoader(self, window)
+        else:
+            self._user_loader = None
+
+        executor = kwargs.get("event_executor")
+        if executor is True:
+            executor = EventExecutor()
+        self.event_executor = executor or None
+
         self.auth = auth
         self.http = HTTPClient(
             self,
             connector=kwargs.get("http_connector"),
             retry_config=kwargs.get("http_retry_config"),
+            coalesce_requests=kwargs.get("http_coalesce_requests", False),
+            response_cache=kwargs.get("http_response_cache"),
+            graphql_batch_size=kwargs.get("http_graphql_batch_size"),
+            graphql_batch_latency=kwargs.get("http_graphql_batch_latency", 0.0),
+            scheduler=kwargs.get("http_scheduler"),
+            circuit_breaker=kwargs.get("http_circuit_breaker"),
+            transport=kwargs.get("http_transport"),
+            hedger=kwargs.get("http_hedging"),
+            decode_threshold=kwargs.get("http_decode_threshold"),
         )
         self.http.add_header("Accept-Language", "en-EN")
 
         self._listeners = {}
+        self._keyed_listeners = {}
         self._events = {}
         self._users = {}
         self._refresh_times = []
@@ -674,6 +895,9 @@ class BasicClient:
     async def _start(self, dispatch_ready: bool = True) -> None:
         await self.init()
 
+        if self.loop_lag is not None:
+            self.loop_lag.start()
+
         if self._first_start:
             self.register_methods()
 
@@ -738,7 +962,13 @@ class BasicClient:
         data["extraExternalAuths"] = extra_ext_data
         self.user = ClientUser(self, data)
 
+    async def _prewarm_connections(self) -> None:
+        await self.http.prewarm((AccountPublicService.BASE,))
+
     async def _login(self, priority: int = 0) -> None:
+        if self.prewarm_connections:
+            self.loop.create_task(self._prewarm_connections())
+
         log.debug("Running authenticating")
         ret = await self.auth._authenticate(priority=priority)
         if ret is False:
@@ -789,6 +1019,9 @@ class BasicClient:
             self._closed = True
             await self.http.close()
 
+            if self.loop_lag is not None:
+                self.loop_lag.stop()
+
         if self.auth.refresh_loop_running():
             self._refresh_task.cancel()
 
@@ -1075,6 +1308,42 @@ class BasicClient:
         except IndexError:
             return None
 
+    async def _resolve_display_names(self, display_names: List[str]) -> List[str]:
+        size = self.DISPLAY_NAME_BATCH_SIZE
+        chunks = [
+            display_names[i : i + size] for i in range(0, len(display_names), size)
+        ]
+        sem = asyncio.Semaphore(self.DISPLAY_NAME_BATCH_CONCURRENCY)
+
+        async def resolve(chunk):
+            async with sem:
+                return await self.http.account_graphql_get_multiple_by_display_name(
+                    chunk
+                )
+
+        user_ids = []
+        results = await asyncio.gather(*(resolve(chunk) for chunk in chunks))
+        for chunk, chunk_results in zip(chunks, results):
+            for display_name, result in zip(chunk, chunk_results):
+                # Errors affecting the whole request are raised by the http
+                # client, so these only concern a single display name.
+                if isinstance(result, HTTPException):
+                    log.debug(
+                        "Failed to look up the display name %r: %s",
+                        display_name,
+                        result.message_code,
+                    )
+                    continue
+
+                account = result.get("account")
+                if account is None:
+                    log.debug("No user found with the display name %r", display_name)
+                    continue
+
+                user_ids.append(account["id"])
+
+        return user_ids
+
     async def fetch_users(
         self, users: Iterable[str], *, cache: bool = False, raw: bool = False
     ) -> List[User]:
@@ -1114,7 +1383,7 @@ class BasicClient:
         """
         _users = []
         new = []
-        tasks = []
+        display_names = []
 
         def find_by_display_name(dn):
             if cache:
@@ -1127,8 +1396,7 @@ class BasicClient:
                     except AttributeError:
                         pass
 
-            task = self.http.account_get_by_display_name(elem)
-            tasks.append(task)
+            display_names.append(dn)
 
         for elem in users:
             if is_display_name(elem):
@@ -1144,29 +1412,30 @@ class BasicClient:
                         continue
                 new.append(elem)
 
-        if not _users and not new and not tasks:
+        if not _users and not new and not display_names:
             return []
 
-        if len(tasks) > 0:
-            pfs = await asyncio.gather(*tasks)
-            for account_data in pfs:
-                new.append(account_data["id"])
+        if display_names:
+            new.extend(await self._resolve_display_names(display_names))
 
-        chunk_tasks = []
-        chunks = (new[i : i + 100] for i in range(0, len(new), 100))
-        for chunk in chunks:
-            task = self.http.account_get_multiple_by_user_id(chunk)  # noqa
-            chunk_tasks.append(task)
-
-        if len(chunk_tasks) > 0:
-            d = await asyncio.gather(*chunk_tasks)
-            for results in d:
-                for result in results:
-                    if raw:
-                        _users.append(result)
-                    else:
-                        u = self.store_user(result, try_cache=cache)
-                        _users.append(u)
+        if self._user_loader is not None:
+            d = (await self._user_loader.load_many(new),) if new else ()
+        else:
+            chunk_tasks = []
+            chunks = (new[i : i + 100] for i in range(0, len(new), 100))
+            for chunk in chunks:
+                task = self.http.account_get_multiple_by_user_id(chunk)  # noqa
+                chunk_tasks.append(task)
+
+            d = await asyncio.gather(*chunk_tasks) if chunk_tasks else ()
+
+        for results in d:
+            for result in results:
+                if raw:
+                    _users.append(result)
+                else:
+                    u = self.store_user(result, try_cache=cache)
+                    _users.append(u)
         return _users
 
     async def fetch_user_by_email(
@@ -1573,48 +1842,105 @@ class BasicClient:
     def _dispatcher(self, coro: Awaitable, *args: Any, **kwargs: Any) -> asyncio.Future:
         return asyncio.ensure_future(coro(*args, **kwargs))
 
+    @staticmethod
+    def _resolve_listeners(listeners: list, args: tuple) -> bool:
+        # Resolves the futures of the listeners whose check passes and
+        # removes them. Returns whether any listeners are left.
+        removed = []
+        for i, (future, check) in enumerate(listeners):
+            if future.cancelled():
+                removed.append(i)
+                continue
+
+            try:
+                result = check(*args)
+            except Exception as e:
+                future.set_exception(e)
+                removed.append(i)
+            else:
+                if result:
+                    if len(args) == 0:
+                        future.set_result(None)
+                    elif len(args) == 1:
+                        future.set_result(args[0])
+                    else:
+                        future.set_result(args)
+                    removed.append(i)
+
+        if len(removed) == len(listeners):
+            return False
+
+        for idx in reversed(removed):
+            del listeners[idx]
+        return True
+
+    def _remove_keyed_listeners(
+        self,
+        event: str,
+        extractor: Callable,
+        key: Any,
+        future: Optional[asyncio.Future] = None,
+    ) -> None:
+        keyed = self._keyed_listeners.get(event)
+        if keyed is None:
+            return
+
+        waiters = keyed.get(extractor)
+        if waiters is None or key not in waiters:
+            return
+
+        if future is not None:
+            listeners = [x for x in waiters[key] if x[0] is not future]
+            if listeners:
+                waiters[key] = listeners
+                return
+
+        del waiters[key]
+        if not waiters:
+            del keyed[extractor]
+            if not keyed:
+                del self._keyed_listeners[event]
+
     def dispatch_event(
         self, event: str, *args: Any, **kwargs: Any
     ) -> List[asyncio.Future]:
         listeners = self._listeners.get(event)
         if listeners:
-            removed = []
-            for i, (future, check) in enumerate(listeners):
-                if future.cancelled():
-                    removed.append(i)
-                    continue
+            if not self._resolve_listeners(listeners, args):
+                self._listeners.pop(event)
 
+        keyed = self._keyed_listeners.get(event)
+        if keyed:
+            for extractor, waiters in tuple(keyed.items()):
                 try:
-                    result = check(*args)
-                except Exception as e:
-                    future.set_exception(e)
-                    removed.append(i)
-                else:
-                    if result:
-                        if len(args) == 0:
-                            future.set_result(None)
-                        elif len(args) == 1:
-                            future.set_result(args[0])
-                        else:
-                            future.set_result(args)
-                        removed.append(i)
+                    key = extractor(*args)
+                except Exception:
+                    continue
 
-            if len(removed) == len(listeners):
-                self._listeners.pop(event)
-            else:
-                for idx in reversed(removed):
-                    del listeners[idx]
+                listeners = waiters.get(key)
+                if listeners and not self._resolve_listeners(listeners, args):
+                    self._remove_keyed_listeners(event, extractor, key)
 
         tasks = []
         if event in self._events:
+            executor = self.event_executor
             for coro in self._events[event]:
-                task = self._dispatcher(coro, *args, **kwargs)
+                if executor is not None:
+                    task = executor.submit(event, coro, *args, **kwargs)
+                else:
+                    task = self._dispatcher(coro, *args, **kwargs)
                 tasks.append(task)
 
         return tasks
 
     def wait_for(
-        self, event: str, *, check: Callable = None, timeout: Optional[int] = None
+        self,
+        event: str,
+        *,
+        check: Callable = None,
+        timeout: Optional[int] = None,
+        key: Any = None,
+        key_extractor: Optional[Callable] = None,
     ) -> Any:
         """|coro|
 
@@ -1679,6 +2005,22 @@ class BasicClient:
         timeout: :class:`int`
             How many seconds to wait for before asyncio.TimeoutError is raised.
             *Defaults to ``None`` which means it will wait forever.*
+        key: Optional[Any]
+            If passed, only events whose key (as returned by ``key_extractor``)
+            equals this value are considered before ``check`` is called.
+            Keyed waits are indexed so dispatching an event only has to look
+            at the waits with a matching key, which makes them a lot cheaper
+            than an equivalent ``check`` when many waits are registered.
+        key_extractor: Optional[Callable]
+            A function called with the arguments of the event which returns
+            its key. Only used with ``key``. Defaults to a function that
+            returns the ``id`` attribute of the first argument, e.g.
+            :attr:`Friend.id` or :attr:`PartyMember.id`.
+
+            .. note::
+
+                Waits are indexed per extractor, so pass the same function
+                every time instead of creating a new lambda per call.
 
         Raises
         ------
@@ -1702,6 +2044,24 @@ class BasicClient:
             check = _check
 
         ev = (event.lower()).replace(self.event_prefix, "")
+        if key is not None:
+            if key_extractor is None:
+                key_extractor = _id_key
+
+            waiters = self._keyed_listeners.setdefault(ev, {}).setdefault(
+                key_extractor, {}
+            )
+            waiters.setdefault(key, []).append((future, check))
+
+            # Don't leave waits that timed out behind for keys that
+            # might never be dispatched.
+            def on_done(fut):
+                if fut.cancelled():
+                    self._remove_keyed_listeners(ev, key_extractor, key, fut)
+
+            future.add_done_callback(on_done)
+            return asyncio.wait_for(future, timeout)
+
         try:
             listeners = self._listeners[ev]
         except KeyError:
@@ -1716,7 +2076,7 @@ class BasicClient:
         return handlers is not None and len(handlers) > 0
 
     def _event_has_destination(self, event: str) -> bool:
-        if event in self._listeners:
+        if event in self._listeners or event in self._keyed_listeners:
             return True
         elif self._event_has_handler(event):
             return True
@@ -2540,6 +2900,53 @@ class Client(BasicClient):
         the client will use the default values specified in the data class.
     http_retry_config: Optional[:class:`HTTPRetryConfig`]
         The config to use for http retries.
+    http_transport: Optional[:class:`HTTPTransport`]
+        The transport used to send http requests. Pass a
+        :class:`RecordReplayTransport` to record requests to or replay them
+        from a cassette. Defaults to :class:`AiohttpTransport`.
+    http_coalesce_requests: :class:`bool`
+        Whether or not identical GET requests running at the same time
+        should share a single underlying request. The result (or
+        exception) is then passed to every caller. Defaults to ``False``.
+    http_response_cache: Union[:class:`bool`, :class:`ResponseCache`]
+        The cache to use for static content like the item shop, news and
+        playlists. If ``True``, a cache shared by all clients in the process
+        is used. Defaults to ``None`` which means responses are not cached.
+    http_graphql_batch_size: Optional[:class:`int`]
+        If set, concurrent GraphQL requests are coalesced into
+        multi-operation posts of up to this many operations. Defaults to
+        ``None`` which means every GraphQL request is posted on its own.
+    http_graphql_batch_latency: :class:`float`
+        How many seconds to wait for more GraphQL requests before a batch
+        is posted. Only used with ``http_graphql_batch_size``. Defaults to
+        ``0`` which means the batch is posted on the next iteration of the
+        event loop.
+    http_scheduler: Union[:class:`bool`, :class:`RequestScheduler`]
+        The scheduler used to limit concurrent requests per service and to
+        prioritize latency critical requests like party updates over bulk
+        requests. If ``True``, a scheduler with the default settings is used.
+        Defaults to ``None`` which means requests are not scheduled.
+    http_decode_threshold: Optional[:class:`int`]
+        Json response bodies of at least this many bytes (e.g. huge friend
+        lists or leaderboards) are decoded in small steps with the standard
+        library json module, yielding to the event loop in between, instead
+        of blocking it for the whole decode. Decoding this way takes about
+        twice as long in total. Defaults to ``None`` which means every
+        response is decoded in one go.
+    monitor_loop_lag: :class:`bool`
+        Whether to measure event loop lag while the client is running.
+        The measurements are available through :attr:`loop_lag`.
+        Defaults to ``False``.
+    http_hedging: Union[:class:`bool`, :class:`RequestHedger`]
+        The hedger used to send a second copy of slow GET requests to routes
+        that allow it, like account and presence lookups. If ``True``, a
+        hedger with the default settings is used. Defaults to ``None`` which
+        means requests are never hedged.
+    http_circuit_breaker: Union[:class:`bool`, :class:`CircuitBreaker`]
+        The circuit breaker used to fail fast with :exc:`ServiceUnavailable`
+        when a service is down instead of retrying requests to it. If
+        ``True``, a circuit breaker with the default settings is used.
+        Defaults to ``None`` which means no circuit breaker is used.
     build: :class:`str`
         The build used by Fortnite.
         Defaults to a valid but maybe outdated value.
@@ -2553,10 +2960,37 @@ class Client(BasicClient):
         The domain used by Fortnite's XMPP services.
     service_port: :class:`int`
         The port used by Fortnite's XMPP services.
+    xmpp_write_queue_size: :class:`int`
+        The amount of stanzas that may wait to be sent over the XMPP
+        websocket before friend messages and presences sent by the client
+        wait for the queue to drain. Defaults to ``100``.
+    xmpp_coalesce_stanzas: :class:`bool`
+        Whether or not stanzas waiting to be sent should be joined and sent
+        in a single websocket frame. Defaults to ``False``.
     cache_users: :class:`bool`
         Whether or not the library should cache :class:`User` objects. Disable
         this if you are running a program with lots of users as this could
         potentially take a big hit on the memory usage. Defaults to ``True``.
+    prewarm_connections: :class:`bool`
+        Whether connections to the services used during startup should be
+        opened in parallel with authentication. This lowers the time it
+        takes for the client to become ready. Defaults to ``False``.
+    user_lookup_batch_window: Optional[:class:`float`]
+        If set, user id lookups (e.g. from :meth:`fetch_user()` or event
+        processing) made within this many seconds of each other are
+        resolved together with one request per 100 ids. Defaults to
+        ``None`` which means every lookup is requested on its own.
+    event_executor: Union[:class:`bool`, :class:`EventExecutor`]
+        The executor used to bound how many event handlers run at the same
+        time. If ``True``, an executor with the default settings is used.
+        Defaults to ``None`` which means every handler is run as soon as
+        its event is dispatched.
+
+        .. note::
+
+            With the ``drop_oldest`` or ``drop_newest`` policy, the futures
+            of dropped handlers returned by ``dispatch_event()`` are
+            cancelled.
     fetch_user_data_in_events: :class:`bool`
         Whether or not user data should be fetched in event processing. Disabling
         this might be useful for larger applications that deals with
@@ -2579,6 +3013,25 @@ class Client(BasicClient):
         is set to false, then the client will attempt to reconnect to the party on a
         startup. If :attr:`DefaultPartyMemberConfig.offline_ttl` is exceeded before
         a reconnect is attempted, then the client will create a new party at startup.
+    presence_filter: Optional[:class:`PresenceFilter`]
+        The filter deciding which friend presences to process. Presences not
+        passing the filter are dropped before they are decoded. Defaults to
+        ``None`` which means all presences are processed.
+    skip_unobserved_presences: :class:`bool`
+        Whether or not presences should be dropped before they are decoded
+        when there is no :func:`event_friend_presence()` handler and nothing
+        waiting for the event with :meth:`wait_for()`. Defaults to ``False``.
+
+        .. warning::
+
+            Skipped presences are not stored, so :attr:`presences`,
+            :meth:`get_presence()` and :attr:`Friend.last_presence` won't
+            be up to date while no one listens for presences.
+    presence_coalesce_window: Optional[:class:`float`]
+        If set, presences are buffered for this many seconds and only the
+        latest presence received from each friend within the window is
+        processed. Defaults to ``None`` which means every presence is
+        processed as soon as it's received.
 
     Attributes
     ----------
@@ -2586,6 +3039,12 @@ class Client(BasicClient):
         The user the client is logged in as.
     party: :class:`ClientParty`
         The party the client is currently connected to.
+    loop_lag: Optional[:class:`LoopLagMonitor`]
+        The event loop lag monitor. ``None`` unless ``monitor_loop_lag``
+        is enabled.
+    presence_coalescer: Optional[:class:`PresenceCoalescer`]
+        The buffer coalescing presences. ``None`` unless
+        ``presence_coalesce_window`` is set.
     """  # noqa
 
     def __init__(self, auth: Auth, **kwargs: Any) -> None:
@@ -2610,16 +3069,27 @@ class Client(BasicClient):
             "xmpp_domain", "xmpp-service-prod.ol.epicgames.com"
         )  # noqa
         self.service_port = kwargs.get("xmpp_port", 5222)
+        self.xmpp_write_queue_size = kwargs.get("xmpp_write_queue_size", 100)
+        self.xmpp_coalesce_stanzas = kwargs.get("xmpp_coalesce_stanzas", False)
         self.fetch_user_data_in_events = kwargs.get("fetch_user_data_in_events", True)  # noqa
         self.wait_for_member_meta_in_events = kwargs.get(
             "wait_for_member_meta_in_events", True
         )  # noqa
         self.leave_party_at_shutdown = kwargs.get("leave_party_at_shutdown", True)  # noqa
+        self.presence_filter = kwargs.get("presence_filter")
+        self.skip_unobserved_presences = kwargs.get("skip_unobserved_presences", False)
+
+        window = kwargs.get("presence_coalesce_window")
+        if window is not None:
+            self.presence_coalescer = PresenceCoalescer(window)
+        else:
+            self.presence_coalescer = None
 
         self.xmpp = XMPPClient(self, ws_connector=kwargs.get("ws_connector"))
         self.party = None
 
         self._listeners = {}
+        self._keyed_listeners = {}
         self._events = {}
         self._friends = {}
         self._pending_friends = {}
@@ -2804,6 +3274,15 @@ class Client(BasicClient):
 
         return await super()._start(dispatch_ready=dispatch_ready)
 
+    async def _prewarm_connections(self) -> None:
+        bases = (
+            AccountPublicService.BASE,
+            FriendsPublicService.BASE,
+            PartyService.BASE,
+            PresencePublicService.BASE,
+        )
+        await asyncio.gather(self.http.prewarm(bases), self.xmpp.prewarm())
+
     async def _login(self, priority: int = 0) -> None:
         res = await super()._login(priority=priority)
         if res is not None:
@@ -2843,6 +3322,9 @@ class Client(BasicClient):
         except Exception:
             pass
 
+        if self.presence_coalescer is not None:
+            self.presence_coalescer.clear()
+
         await super()._close(
             close_http=close_http,
             dispatch_close=dispatch_close,
@@ -3260,7 +3742,7 @@ class Client(BasicClient):
             Object of the friend you just added.
         """
         await super().add_friend(user_id)
-        friend = await self.wait_for("friend_add", check=lambda f: f.id == user_id)
+        friend = await self.wait_for("friend_add", key=user_id)
         return friend
 
     async def _reconnect_to_party(self, data: Optional[dict] = None) -> None:
@@ -3374,14 +3856,10 @@ class Client(BasicClient):
             self.party = party
 
             def check(m):
-                if m.id != self.user.id:
-                    return False
-                if party.id != m.party.id:
-                    return False
-                return True
+                return party.id == m.party.id
 
             future = asyncio.ensure_future(
-                self.wait_for(event, check=check, timeout=5),
+                self.wait_for(event, key=self.user.id, check=check, timeout=5),
             )
 
             try:
@@ -0,0 +1,137 @@
+"""
+MIT License
+
+Copyright (c) 2019-2021 Terbau
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+
+from typing import Any, Union
+
+
+class JSONCodec:
+    """The codec used to encode and decode all json in the library. This
+    default implementation uses the standard library :mod:`json` module.
+
+    Subclass this and pass an instance to :func:`set_json_codec()` to use
+    another json implementation.
+    """
+
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """A codec using `orjson <https://github.com/ijl/orjson>`_.
+
+    Raises
+    ------
+    ImportError
+        orjson is not installed.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self.loads = orjson.loads
+        self._dumps = orjson.dumps
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj).decode("utf-8")
+
+
+class UJSONCodec(JSONCodec):
+    """A codec using `ujson <https://github.com/ultrajson/ultrajson>`_.
+
+    Raises
+    ------
+    ImportError
+        ujson is not installed.
+    """
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+
+        self.loads = ujson.loads
+        self._dumps = ujson.dumps
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj, ensure_ascii=False)
+
+
+_codecs = {
+    JSONCodec.name: JSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UJSONCodec.name: UJSONCodec,
+}
+
+_codec = JSONCodec()
+loads = _codec.loads
+dumps = _codec.dumps
+
+
+def get_json_codec() -> JSONCodec:
+    """Returns the json codec currently in use.
+
+    Returns
+    -------
+    :class:`JSONCodec`
+    """
+    return _codec
+
+
+def set_json_codec(codec: Union[str, JSONCodec]) -> None:
+    """Sets the json codec used by every part of the library. This should
+    be called before any clients are started.
+
+    Parameters
+    ----------
+    codec: Union[:class:`str`, :class:`JSONCodec`]
+        The codec instance or the name of a builtin codec. Builtin codecs
+        are ``json`` (the default), ``orjson`` and ``ujson``.
+
+    Raises
+    ------
+    ValueError
+        No builtin codec with the name passed exists.
+    ImportError
+        The package required by the codec is not installed.
+    """
+    global _codec, loads, dumps
+
+    if isinstance(codec, str):
+        try:
+            codec = _codecs[codec]()
+        except KeyError:
+            raise ValueError("{0!r} is not a valid json codec".format(codec))
+
+    _codec = codec
+    loads = codec.loads
+    dumps = codec.dumps
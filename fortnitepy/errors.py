@@ -161,6 +161,27 @@ class InvalidOffer(FortniteException):
     pass
 
 
+class ServiceUnavailable(FortniteException):
+    """This exception is raised when a request is attempted to a service
+    that has been marked as down by the :class:`CircuitBreaker`.
+
+    Attributes
+    ----------
+    base: :class:`str`
+        The base url of the service.
+    retry_after: :class:`float`
+        The amount of seconds until the service is probed again.
+    """
+
+    def __init__(self, base: str, retry_after: float) -> None:
+        self.base = base
+        self.retry_after = retry_after
+
+        super().__init__(
+            "{0} is unavailable. Retrying in {1:.2f}s.".format(base, retry_after)
+        )
+
+
 class ValidationFailure(FortniteException):
     """Represents a validation failure returned.
 
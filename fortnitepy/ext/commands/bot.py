@@ -849,7 +849,8 @@ class Bot(GroupMixin, Client):
         self, futures: List[asyncio.Future], ctx: Context, error: Exception
     ) -> None:
         def check(future):
-            return future.result() is False
+            # Handlers dropped by the client's event executor are cancelled.
+            return not future.cancelled() and future.result() is False
 
         ret = await self.wait_for_futures(futures, check=check)
         if isinstance(ret, asyncio.Future):
@@ -31,7 +31,7 @@ from .errors import FriendOffline, InvalidOffer, PartyError, Forbidden, HTTPExce
 from .presence import Presence
 from .enums import Platform
 from .avatar import Avatar
-from .utils import from_iso
+from .utils import from_iso, _presence_friend_id_key
 
 if TYPE_CHECKING:
     from .client import Client
@@ -216,8 +216,6 @@ class Friend(FriendBase):
 
     def _online_check(self, available: bool) -> bool:
         def check(b, a):
-            if a.friend.id != self.id:
-                return False
             return a.available is available
 
         return check
@@ -231,7 +229,10 @@ class Friend(FriendBase):
         pres = self.last_presence
         if pres is None or pres.available is False:
             pres = await self.client.wait_for(
-                "friend_presence", check=self._online_check(available=True)
+                "friend_presence",
+                key=self.id,
+                key_extractor=_presence_friend_id_key,
+                check=self._online_check(available=True),
             )
 
     async def wait_until_offline(self) -> None:
@@ -243,7 +244,10 @@ class Friend(FriendBase):
         pres = self.last_presence
         if pres is not None and pres.available is not False:
             pres = await self.client.wait_for(
-                "friend_presence", check=self._online_check(available=False)
+                "friend_presence",
+                key=self.id,
+                key_extractor=_presence_friend_id_key,
+                check=self._online_check(available=False),
             )
 
     async def fetch_last_logout(self) -> Optional[datetime.datetime]:
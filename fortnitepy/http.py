@@ -23,17 +23,29 @@ SOFTWARE.
 """
 
 import asyncio
-import functools
-import json
+import copy
 import logging
 import re
 import time
-from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple, Union
-from urllib.parse import quote as urllibquote
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import quote as urllibquote, urlsplit
 
 import aiohttp
 
-from .errors import HTTPException
+from . import codec
+from .errors import HTTPException, ServiceUnavailable
+from .transport import AiohttpTransport, HTTPTransport, json_or_text
 from .utils import MaybeLock
 
 if TYPE_CHECKING:
@@ -43,6 +55,17 @@ log = logging.getLogger(__name__)
 
 GRAPHQL_HTML_ERROR_PATTERN = re.compile(r"<title>((\d+).*)<\/title>", re.MULTILINE)
 
+# Error codes of GraphQL operations that mean the whole request failed.
+GRAPHQL_REQUEST_ERROR_CODES = frozenset(
+    (
+        "errors.com.epicgames.common.oauth.invalid_token",
+        "errors.com.epicgames.common.authentication.token_verification_failed",
+        "error.graphql.401",
+        "errors.com.epicgames.common.throttled",
+        "errors.com.epicgames.common.server_error",
+    )
+)
+
 
 def quote(string: str) -> str:
     string = urllibquote(string)
@@ -73,6 +96,15 @@ class HTTPRetryConfig:
         raising the original exception. This works by keeping track of the
         total seconds that has been waited for the request regardless of
         number of attempts. If ``None`` this is ignored. Defaults to ``65``.
+
+        .. note::
+
+            A single request can be bounded by passing ``timeout`` (seconds)
+            or ``deadline`` (a :meth:`asyncio.loop.time` timestamp) to it,
+            e.g. ``client.http.get(route, timeout=5)``. The budget covers
+            every attempt, token refresh, rate limit wait and backoff, and
+            :exc:`asyncio.TimeoutError` is raised as soon as the remaining
+            budget can't cover the next wait.
     handle_rate_limits: :class:`bool`
         Whether or not the client should handle rate limit errors and wait
         the received ``Retry-After`` before automatically retrying the request.
@@ -108,7 +140,18 @@ class HTTPRetryConfig:
         The cap for the exponential backoff to avoid having
         unrealistically high wait times. Defaults to ``20``. *Only matters
         when ``handle_capacity_throttling`` is ``True``*
-    """
+    proactive_rate_limits: :class:`bool`
+        Whether or not the client should limit its own request rate per
+        endpoint instead of only reacting to throttling errors. Requests
+        that would exceed an endpoint's bucket are queued locally until
+        a token is available. Buckets learn from ``Retry-After`` and
+        ``X-RateLimit-*`` response headers. Defaults to ``False``.
+    rate_limits: Dict[Type[:class:`Route`], Tuple[:class:`int`, :class:`float`]]
+        Bucket sizes mapped to route classes. Each value is a tuple of
+        ``(requests, per_seconds)`` and overrides :attr:`Route.RATE_LIMIT`
+        for every endpoint of that route class. *Only matters when
+        ``proactive_rate_limits`` is ``True``*
+    """  # noqa
 
     def __init__(self, **kwargs):
         self.max_retry_attempts = kwargs.get("max_retry_attempts", 5)
@@ -123,6 +166,257 @@ class HTTPRetryConfig:
         self.backoff_factor = kwargs.get("backoff_factor", 1.5)
         self.backoff_cap = kwargs.get("backoff_cap", 20)
 
+        self.proactive_rate_limits = kwargs.get("proactive_rate_limits", False)
+        self.rate_limits = kwargs.get("rate_limits", {})
+
+
+class RateLimitBucket:
+    """A token bucket used to proactively limit the requests sent to a
+    single endpoint. Requests waiting for a token are served in the order
+    they arrived.
+
+    Parameters
+    ----------
+    capacity: Optional[:class:`int`]
+        The amount of requests allowed per ``period``. If ``None``, the
+        bucket only blocks when a rate limit has been received.
+    period: :class:`float`
+        The time window in seconds the capacity applies to.
+    adaptive: :class:`bool`
+        Whether the capacity and period should be replaced by the limits
+        received in rate limit headers. Buckets without a capacity always
+        learn it from the headers. Defaults to ``True``.
+    """
+
+    def __init__(
+        self, capacity: Optional[int] = None, period: float = 1, adaptive: bool = True
+    ) -> None:
+        self.capacity = capacity
+        self.period = period
+        self.adaptive = adaptive
+        self.tokens = float(capacity) if capacity is not None else 0.0
+        self.blocked_until = 0.0
+
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.capacity is not None:
+            elapsed = now - self._updated_at
+            self.tokens = min(
+                float(self.capacity),
+                self.tokens + elapsed * (self.capacity / self.period),
+            )
+
+        self._updated_at = now
+
+    def get_delay(self) -> float:
+        """Returns the amount of seconds until a request could be sent."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        self._refill(now)
+        if self.capacity is None or self.tokens >= 1:
+            return 0.0
+
+        return (1 - self.tokens) / (self.capacity / self.period)
+
+    async def acquire(self) -> float:
+        """|coro|
+
+        Waits until a token is available and consumes it.
+
+        Returns
+        -------
+        :class:`float`
+            The amount of seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                delay = self.get_delay()
+                if delay <= 0:
+                    if self.capacity is not None:
+                        self.tokens -= 1
+                    return waited
+
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def block(self, seconds: float) -> None:
+        """Blocks the bucket for the given amount of seconds. Used when a
+        ``Retry-After`` is received.
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def update(
+        self,
+        limit: Optional[int] = None,
+        remaining: Optional[int] = None,
+        reset_after: Optional[float] = None,
+    ) -> None:
+        """Updates the bucket from the rate limit information received
+        from a response.
+        """
+        self._refill(time.monotonic())
+
+        if limit is not None and reset_after is not None and reset_after > 0:
+            if self.capacity is None or self.adaptive:
+                self.capacity = limit
+                self.period = reset_after
+
+        if remaining is not None:
+            if remaining <= 0 and reset_after is not None:
+                self.block(reset_after)
+            elif self.capacity is not None:
+                self.tokens = min(self.tokens, float(remaining))
+
+
+class ResponseCacheEntry:
+    __slots__ = ("data", "expires_at", "etag", "last_modified")
+
+    def __init__(
+        self,
+        data: Any,
+        expires_at: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self.data = data
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def can_revalidate(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+
+class ResponseCache:
+    """An in-memory cache for responses of static GET routes like the
+    item shop and the news/playlists content payload.
+
+    Expired entries are revalidated with ``If-None-Match`` and
+    ``If-Modified-Since`` when the service sent an ``ETag`` or
+    ``Last-Modified`` header. Passing the same instance to multiple
+    clients (or using :meth:`ResponseCache.shared()`) makes them share
+    entries, meaning only one request is done for all of them. That
+    request is done by the client that needed the entry first. If it fails
+    for reasons other than an error response, e.g. because that client
+    closed, the other clients do the request again themselves.
+
+    .. warning::
+
+        Cached payloads are shared between all callers and must therefore
+        not be mutated.
+
+    Parameters
+    ----------
+    ttls: Optional[Dict[:class:`str`, :class:`float`]]
+        TTLs in seconds mapped to route paths, e.g.
+        ``{'/fortnite/api/storefront/v2/catalog': 120}``. These are merged
+        into :attr:`ResponseCache.DEFAULT_TTLS`. A TTL of ``None`` disables
+        caching for that route. Only routes with a TTL are cached.
+    max_entries: :class:`int`
+        The max amount of entries to keep. The oldest entries are evicted
+        first. Defaults to ``256``.
+
+    Attributes
+    ----------
+    hits: :class:`int`
+        The amount of requests served from the cache without any request.
+    revalidations: :class:`int`
+        The amount of requests served from the cache after the service
+        responded with ``304 Not Modified``.
+    misses: :class:`int`
+        The amount of requests that had to fetch the full payload.
+    """
+
+    DEFAULT_TTLS = {
+        "/content/api/pages/fortnite-game": 300,
+        "/fortnite/api/storefront/v2/catalog": 60,
+        "/fortnite/api/calendar/v1/timeline": 60,
+        "/lightswitch/api/service/bulk/status": 30,
+    }
+
+    # Request headers that change the payload returned. Requests only
+    # share entries if these are the same.
+    VARY_HEADERS = ("accept-language", "x-epic-language")
+
+    _shared = None
+
+    def __init__(
+        self, *, ttls: Optional[Dict[str, float]] = None, max_entries: int = 256
+    ) -> None:
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+        self._entries = {}
+        self._pending = {}
+
+    @classmethod
+    def shared(cls) -> "ResponseCache":
+        """Returns the process wide cache instance, creating it if needed."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def get_ttl(self, route: Union["Route", str]) -> Optional[float]:
+        if not isinstance(route, Route):
+            return None
+        return self.ttls.get(route.path)
+
+    def get_key(
+        self, route: "Route", params: Any = None, headers: Optional[dict] = None
+    ) -> tuple:
+        vary = ()
+        if headers:
+            lowered = {k.lower(): v for k, v in headers.items()}
+            vary = tuple(lowered.get(name) for name in self.VARY_HEADERS)
+
+        return (route.url, repr(params), vary)
+
+    def get(self, key: tuple) -> Optional[ResponseCacheEntry]:
+        return self._entries.get(key)
+
+    def set(self, key: tuple, data: Any, headers: Any, ttl: float) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = ResponseCacheEntry(
+            data,
+            time.monotonic() + ttl,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def remove(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+AUTH_PLACEHOLDERS = {
+    "IOS_BASIC_TOKEN": lambda auth: "basic {0}".format(auth.ios_token),
+    "FORTNITE_BASIC_TOKEN": lambda auth: "basic {0}".format(auth.fortnite_token),
+    "IOS_ACCESS_TOKEN": lambda auth: auth.ios_authorization,
+    "FORTNITE_ACCESS_TOKEN": lambda auth: auth.authorization,
+}
+
+
+def get_graphql_payload(data: dict) -> Any:
+    return next(iter(data["data"].values()))
+
 
 class GraphQLRequest:
     def __init__(
@@ -171,6 +465,24 @@ class Route:
         at http.py if you're interested in knowing all of the predefined
         routes.
 
+    Routes can optionally set the class attribute ``RATE_LIMIT`` to a
+    tuple of ``(requests, per_seconds)``. This is used as the bucket size
+    for every endpoint of the route when
+    :attr:`HTTPRetryConfig.proactive_rate_limits` is enabled. The services
+    known to throttle (account, user search, friends, party, presence and
+    stats) have conservative defaults which are refined by the rate limit
+    headers received and can be overridden with
+    :attr:`HTTPRetryConfig.rate_limits`.
+
+    Routes can also set the class attribute ``PRIORITY_CLASS`` to one of
+    ``auth``, ``party``, ``social`` or ``bulk`` (the default). This decides
+    how requests to the route are scheduled when a :class:`RequestScheduler`
+    is used.
+
+    GET routes that are safe to send twice can set the class attribute
+    ``HEDGE`` to ``True``. Slow requests to them are then hedged when a
+    :class:`RequestHedger` is used.
+
     Available authentication placeholders:
     - `IOS_BASIC_TOKEN`
     - `FORTNITE_BASIC_TOKEN`
@@ -210,6 +522,12 @@ class Route:
     auth: Optional[:class:`str`]
         The authentication to use for the request. If ``None`` the default
         auth specified for the route is used.
+    priority_class: Optional[:class:`str`]
+        The priority class to schedule the request with. If ``None`` the
+        default priority class specified for the route is used.
+    hedge: Optional[:class:`bool`]
+        Whether slow requests to the route may be hedged. If ``None`` the
+        default specified for the route is used.
     **params: Any
         The variables to format the path with passed alongside their name.
 
@@ -231,21 +549,40 @@ class Route:
 
     BASE = ""
     AUTH = None
+    RATE_LIMIT = None
+    PRIORITY_CLASS = "bulk"
+    HEDGE = False
 
-    def __init__(self, path: str = "", *, auth: str = None, **params: Any) -> None:
+    def __init__(
+        self,
+        path: str = "",
+        *,
+        auth: str = None,
+        priority_class: str = None,
+        hedge: bool = None,
+        **params: Any,
+    ) -> None:
         self.path = path
-        self.params = {
-            k: (quote(v) if isinstance(v, str) else v) for k, v in params.items()
-        }
+
+        if params:
+            self.params = {
+                k: (quote(v) if isinstance(v, str) else v) for k, v in params.items()
+            }
+        else:
+            self.params = params
 
         if self.BASE == "":
             raise ValueError("Route must have a base")
 
-        self.sanitized_url = url = self.BASE + self.path
-        self.url = url.format(**self.params) if self.params else url
+        self.sanitized_url = url = self.BASE + path
+        self.url = url.format_map(self.params) if self.params else url
 
         if auth:
             self.AUTH = auth
+        if priority_class:
+            self.PRIORITY_CLASS = priority_class
+        if hedge is not None:
+            self.HEDGE = hedge
 
         self.base = self.BASE
         self.auth = self.AUTH
@@ -274,11 +611,16 @@ class LightswitchPublicService(Route):
 class UserSearchService(Route):
     BASE = "https://user-search-service-prod.ol.epicgames.com"
     AUTH = "FORTNITE_ACCESS_TOKEN"
+    RATE_LIMIT = (10, 1)
+    PRIORITY_CLASS = "social"
 
 
 class AccountPublicService(Route):
     BASE = "https://account-public-service-prod.ol.epicgames.com"
     AUTH = "FORTNITE_ACCESS_TOKEN"
+    RATE_LIMIT = (10, 1)
+    PRIORITY_CLASS = "social"
+    HEDGE = True
 
 
 class EulatrackingPublicService(Route):
@@ -309,21 +651,29 @@ class FortnitePublicService(Route):
 class FriendsPublicService(Route):
     BASE = "https://friends-public-service-prod.ol.epicgames.com"
     AUTH = "FORTNITE_ACCESS_TOKEN"
+    RATE_LIMIT = (10, 1)
+    PRIORITY_CLASS = "social"
 
 
 class PartyService(Route):
     BASE = "https://party-service-prod.ol.epicgames.com"
     AUTH = "FORTNITE_ACCESS_TOKEN"
+    RATE_LIMIT = (10, 1)
+    PRIORITY_CLASS = "party"
 
 
 class PresencePublicService(Route):
     BASE = "https://presence-public-service-prod.ol.epicgames.com"
     AUTH = "FORTNITE_ACCESS_TOKEN"
+    RATE_LIMIT = (10, 1)
+    PRIORITY_CLASS = "social"
+    HEDGE = True
 
 
 class StatsproxyPublicService(Route):
     BASE = "https://statsproxy-public-service-live.ol.epicgames.com"
     AUTH = "FORTNITE_ACCESS_TOKEN"
+    RATE_LIMIT = (5, 1)
 
 
 class AvatarService(Route):
@@ -331,57 +681,735 @@ class AvatarService(Route):
     AUTH = "FORTNITE_ACCESS_TOKEN"
 
 
-def create_aiohttp_closed_event(session) -> asyncio.Event:
-    """Work around aiohttp issue that doesn't properly close transports on exit.
+class ConnectionPool:
+    """A bounded pool of connections that can be shared by multiple clients
+    running in the same process. Each client still keeps its own session,
+    cookie jar and auth headers, only the underlying connections are shared.
+
+    Websocket connections for XMPP are long-lived and therefore use a
+    separate connector which shares dns cache settings but is not bounded
+    by ``limit_per_host``.
 
-    See https://github.com/aio-libs/aiohttp/issues/1925#issuecomment-639080209
+    .. note::
 
-    Returns:
-       An event that will be set once all transports have been properly closed.
+        A pool created by :func:`start_multiple()` or :func:`run_multiple()`
+        is closed automatically when all clients are closed. Pools you
+        create and pass yourself must be closed with
+        :meth:`ConnectionPool.close()`.
+
+    Parameters
+    ----------
+    limit: :class:`int`
+        The max amount of simultaneous http connections. Defaults to ``100``.
+    limit_per_host: :class:`int`
+        The max amount of simultaneous http connections to a single host.
+        Defaults to ``20``.
+    keepalive_timeout: :class:`float`
+        The amount of seconds an idle connection is kept open before
+        being closed. Defaults to ``30``.
+    ttl_dns_cache: :class:`int`
+        The amount of seconds resolved dns records are cached for.
+        Defaults to ``300``.
     """
 
-    transports = 0
-    all_is_lost = asyncio.Event()
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 30,
+        ttl_dns_cache: int = 300,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+
+        self._http_connector = None
+        self._ws_connector = None
+
+    @property
+    def http_connector(self) -> aiohttp.TCPConnector:
+        """:class:`aiohttp.TCPConnector`: The connector used for http requests."""
+        if self._http_connector is None or self._http_connector.closed:
+            self._http_connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+            )
+        return self._http_connector
+
+    @property
+    def ws_connector(self) -> aiohttp.TCPConnector:
+        """:class:`aiohttp.TCPConnector`: The connector used for websocket
+        connections.
+        """
+        if self._ws_connector is None or self._ws_connector.closed:
+            self._ws_connector = aiohttp.TCPConnector(
+                limit=0,
+                ttl_dns_cache=self.ttl_dns_cache,
+            )
+        return self._ws_connector
+
+    def register(self, client: "Client") -> None:
+        """Registers the pools connectors to a client. This must be done
+        before the client is started.
+        """
+        kwargs = {"http_connector": self.http_connector}
+        if hasattr(client, "xmpp"):
+            kwargs["ws_connector"] = self.ws_connector
+
+        client.register_connectors(**kwargs)
+
+    @staticmethod
+    def _get_connector_stats(connector: Optional[aiohttp.BaseConnector]) -> dict:
+        if connector is None:
+            return {"acquired": 0, "idle": 0, "hosts": {}}
+
+        hosts = {}
+        for key, conns in getattr(connector, "_conns", {}).items():
+            hosts.setdefault(key.host, {"acquired": 0, "idle": 0})
+            hosts[key.host]["idle"] += len(conns)
+
+        acquired_per_host = getattr(connector, "_acquired_per_host", {})
+        for key, acquired in acquired_per_host.items():
+            hosts.setdefault(key.host, {"acquired": 0, "idle": 0})
+            hosts[key.host]["acquired"] += len(acquired)
+
+        return {
+            "acquired": len(getattr(connector, "_acquired", ())),
+            "idle": sum(h["idle"] for h in hosts.values()),
+            "hosts": hosts,
+        }
+
+    def get_stats(self) -> Dict[str, dict]:
+        """Returns connection stats for the pool.
+
+        Returns
+        -------
+        Dict[:class:`str`, :class:`dict`]
+            A dict with the keys ``http`` and ``ws``. Each value contains
+            the total ``acquired`` and ``idle`` connection counts and
+            ``hosts`` which maps hosts to their own counts.
+        """
+        return {
+            "http": self._get_connector_stats(self._http_connector),
+            "ws": self._get_connector_stats(self._ws_connector),
+        }
+
+    async def close(self) -> None:
+        """|coro|
 
-    def connection_lost(exc, orig_lost):
-        nonlocal transports
+        Closes all connections in the pool.
+        """
+        for connector in (self._http_connector, self._ws_connector):
+            if connector is not None and not connector.closed:
+                await connector.close()
 
+
+class ServiceQueue:
+    __slots__ = ("active", "waiters", "vtimes", "vtime")
+
+    def __init__(self, priority_classes: Iterable[str]) -> None:
+        self.active = 0
+        self.waiters = {name: deque() for name in priority_classes}
+        self.vtimes = dict.fromkeys(priority_classes, 0.0)
+        self.vtime = 0.0
+
+
+class RequestScheduler:
+    """Schedules the requests of a client so that latency critical
+    requests are not starved by bulk requests to the same service.
+
+    Every service (:attr:`Route.BASE`) gets a max amount of requests that
+    can be in flight at the same time. When a service is saturated, waiting
+    requests are queued by their priority class and started using weighted
+    fair queuing, meaning a class with twice the weight gets twice the
+    share of freed up slots while no class is starved completely.
+
+    Parameters
+    ----------
+    max_concurrency: :class:`int`
+        The max amount of concurrent requests per service. Defaults to ``8``.
+    service_limits: Dict[:class:`str`, :class:`int`]
+        Max concurrency overrides for specific services mapped by the
+        route base. Defaults to an empty dict.
+    weights: Dict[:class:`str`, :class:`int`]
+        The weight of every priority class. Defaults to ``auth: 8``,
+        ``party: 4``, ``social: 2`` and ``bulk: 1``.
+    """
+
+    DEFAULT_WEIGHTS = {
+        "auth": 8,
+        "party": 4,
+        "social": 2,
+        "bulk": 1,
+    }
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        service_limits: Optional[Dict[str, int]] = None,
+        weights: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.service_limits = service_limits or {}
+        self.weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+
+        self._queues = {}
+        self._waited = dict.fromkeys(self.weights, 0.0)
+        self._max_waited = dict.fromkeys(self.weights, 0.0)
+        self._scheduled = dict.fromkeys(self.weights, 0)
+
+    def _get_queue(self, base: str) -> ServiceQueue:
         try:
-            orig_lost(exc)
-        finally:
-            transports -= 1
-            if transports == 0:
-                all_is_lost.set()
+            return self._queues[base]
+        except KeyError:
+            queue = self._queues[base] = ServiceQueue(self.weights)
+            return queue
+
+    def _get_limit(self, base: str) -> int:
+        return self.service_limits.get(base, self.max_concurrency)
+
+    async def acquire(self, base: str, priority_class: str) -> float:
+        """|coro|
+
+        Waits for a free slot for a request to the service.
+
+        Parameters
+        ----------
+        base: :class:`str`
+            The base of the route requested.
+        priority_class: :class:`str`
+            The priority class of the request.
+
+        Raises
+        ------
+        ValueError
+            The priority class passed is not valid.
+
+        Returns
+        -------
+        :class:`float`
+            The amount of seconds waited.
+        """
+        if priority_class not in self.weights:
+            raise ValueError(
+                "{0!r} is not a valid priority class".format(priority_class)
+            )
+
+        queue = self._get_queue(base)
+        waiters = queue.waiters[priority_class]
+
+        started_at = time.monotonic()
+        if queue.active < self._get_limit(base) and not any(
+            queue.waiters.values()
+        ):
+            queue.active += 1
+        else:
+            # A class that becomes backlogged starts at the current virtual
+            # time so it can't use up credit built up while it was idle.
+            if not waiters:
+                queue.vtimes[priority_class] = max(
+                    queue.vtimes[priority_class], queue.vtime
+                )
+
+            future = asyncio.get_running_loop().create_future()
+            waiters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release(base)
+                else:
+                    try:
+                        waiters.remove(future)
+                    except ValueError:
+                        pass
+                raise
+
+        waited = time.monotonic() - started_at
+        self._scheduled[priority_class] += 1
+        self._waited[priority_class] += waited
+        if waited > self._max_waited[priority_class]:
+            self._max_waited[priority_class] = waited
+
+        return waited
+
+    def release(self, base: str) -> None:
+        """Releases a slot acquired with :meth:`acquire()`.
+
+        Parameters
+        ----------
+        base: :class:`str`
+            The base of the route requested.
+        """
+        queue = self._queues[base]
+        queue.active -= 1
+
+        while queue.active < self._get_limit(base):
+            backlogged = [name for name, w in queue.waiters.items() if w]
+            if not backlogged:
+                break
+
+            name = min(backlogged, key=lambda n: queue.vtimes[n])
+            queue.vtime = queue.vtimes[name]
+            queue.vtimes[name] += 1 / self.weights[name]
+
+            future = queue.waiters[name].popleft()
+            if not future.done():
+                queue.active += 1
+                future.set_result(None)
+
+    def get_stats(self) -> dict:
+        """Returns the current queue depths per service and priority class
+        along with the wait time of every priority class.
+
+        Returns
+        -------
+        :class:`dict`
+            A dict with the keys ``services`` and ``classes``. Every service
+            maps to its amount of ``active`` requests and ``queued`` requests
+            by priority class. Every class maps to its amount of
+            ``scheduled`` requests and their ``avg_wait`` and ``max_wait``
+            in seconds.
+        """
+        services = {}
+        for base, queue in self._queues.items():
+            services[base] = {
+                "active": queue.active,
+                "queued": {name: len(w) for name, w in queue.waiters.items()},
+            }
+
+        classes = {}
+        for name, scheduled in self._scheduled.items():
+            classes[name] = {
+                "scheduled": scheduled,
+                "avg_wait": self._waited[name] / scheduled if scheduled else 0.0,
+                "max_wait": self._max_waited[name],
+            }
+
+        return {"services": services, "classes": classes}
+
+
+class CircuitState:
+    __slots__ = ("state", "results", "opened_at", "probes")
+
+    def __init__(self) -> None:
+        self.state = "closed"
+        self.results = deque()
+        self.opened_at = None
+        self.probes = 0
+
+
+class CircuitBreaker:
+    """Stops requests to a service (:attr:`Route.BASE`) that appears to be
+    down instead of letting every caller go through the retry logic.
+
+    Once ``failure_rate`` of the requests to a service within ``window``
+    seconds have failed with a server error or a connection error, the
+    circuit opens and requests to the service raise
+    :exc:`ServiceUnavailable` without being sent. After ``recovery_time``
+    seconds the circuit is half-open and up to ``probe_requests`` requests
+    are let through. If they succeed the circuit closes again, otherwise it
+    stays open for another ``recovery_time`` seconds.
+
+    :func:`event_service_unavailable()` and
+    :func:`event_service_recover()` are dispatched on the client that made
+    the request causing the state change.
+
+    Parameters
+    ----------
+    failure_rate: :class:`float`
+        The ratio of failed requests needed to open the circuit.
+        Defaults to ``0.5``.
+    min_requests: :class:`int`
+        The minimum amount of requests within the window before the
+        failure rate is considered. Defaults to ``10``.
+    window: :class:`float`
+        The amount of seconds requests are taken into account for.
+        Defaults to ``30``.
+    recovery_time: :class:`float`
+        The amount of seconds an open circuit waits before probing the
+        service again. Defaults to ``30``.
+    probe_requests: :class:`int`
+        The amount of concurrent requests let through while half-open.
+        Defaults to ``1``.
+    """
 
-    def eof_received(orig_eof_received):
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_requests: int = 10,
+        window: float = 30,
+        recovery_time: float = 30,
+        probe_requests: int = 1,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.recovery_time = recovery_time
+        self.probe_requests = probe_requests
+
+        self._circuits = {}
+
+    def _get_circuit(self, base: str) -> CircuitState:
         try:
-            orig_eof_received()
-        except AttributeError:
-            # It may happen that eof_received() is called after
-            # _app_protocol and _transport are set to None.
-            pass
+            return self._circuits[base]
+        except KeyError:
+            circuit = self._circuits[base] = CircuitState()
+            return circuit
+
+    def get_state(self, base: str) -> str:
+        """Returns the state of the circuit of a service.
+
+        Parameters
+        ----------
+        base: :class:`str`
+            The base url of the service.
+
+        Returns
+        -------
+        :class:`str`
+            ``closed``, ``open`` or ``half_open``.
+        """
+        circuit = self._circuits.get(base)
+        if circuit is None:
+            return "closed"
+
+        if circuit.state == "open":
+            if time.monotonic() - circuit.opened_at >= self.recovery_time:
+                return "half_open"
+        return circuit.state
+
+    def before_request(self, base: str) -> bool:
+        """Checks whether a request to a service is allowed. Every call
+        must be followed up by a call to :meth:`record()`.
+
+        Parameters
+        ----------
+        base: :class:`str`
+            The base url of the service.
+
+        Raises
+        ------
+        ServiceUnavailable
+            The circuit of the service is open.
+
+        Returns
+        -------
+        :class:`bool`
+            ``True`` if the request was let through as a probe of a
+            half-open circuit. Must be passed on to :meth:`record()`.
+        """
+        circuit = self._get_circuit(base)
+        if circuit.state == "closed":
+            return False
+
+        elapsed = time.monotonic() - circuit.opened_at
+        if elapsed < self.recovery_time:
+            raise ServiceUnavailable(base, self.recovery_time - elapsed)
+
+        if circuit.probes >= self.probe_requests:
+            raise ServiceUnavailable(base, 0)
+
+        circuit.state = "half_open"
+        circuit.probes += 1
+        return True
+
+    def record(
+        self, base: str, failed: Optional[bool], probe: bool = False
+    ) -> Optional[str]:
+        """Records the outcome of a request allowed by
+        :meth:`before_request()`.
+
+        Parameters
+        ----------
+        base: :class:`str`
+            The base url of the service.
+        failed: Optional[:class:`bool`]
+            Whether the request failed because of the service. ``None`` if
+            the request was abandoned before an outcome was known.
+        probe: :class:`bool`
+            The value returned by :meth:`before_request()` for the request.
+
+        Returns
+        -------
+        Optional[:class:`str`]
+            The new state of the circuit if it changed, else ``None``.
+        """
+        circuit = self._get_circuit(base)
+        now = time.monotonic()
+
+        if probe:
+            if circuit.probes > 0:
+                circuit.probes -= 1
+
+            if failed is None:
+                return None
+
+            if circuit.state == "half_open":
+                if failed:
+                    circuit.state = "open"
+                    circuit.opened_at = now
+                    return None
+
+                circuit.state = "closed"
+                circuit.results.clear()
+                circuit.opened_at = None
+                return "closed"
+
+        # Only probes decide when an open circuit closes again. Outcomes of
+        # requests sent before the circuit opened are ignored.
+        if circuit.state != "closed":
+            return None
 
-    for conn in session.connector._conns.values():
-        for handler, _ in conn:
-            proto = getattr(handler.transport, "_ssl_protocol", None)
-            if proto is None:
-                continue
+        if failed is None:
+            return None
 
-            transports += 1
-            orig_lost = proto.connection_lost
-            orig_eof_received = proto.eof_received
+        results = circuit.results
+        results.append((now, failed))
+        while results and now - results[0][0] > self.window:
+            results.popleft()
 
-            proto.connection_lost = functools.partial(
-                connection_lost, orig_lost=orig_lost
-            )
-            proto.eof_received = functools.partial(
-                eof_received, orig_eof_received=orig_eof_received
+        if len(results) < self.min_requests:
+            return None
+
+        failures = sum(1 for _, f in results if f)
+        if failures / len(results) >= self.failure_rate:
+            circuit.state = "open"
+            circuit.opened_at = now
+            results.clear()
+            return "open"
+        return None
+
+
+class RequestHedger:
+    """Hedges slow requests to idempotent GET routes. If a request to a
+    route with ``HEDGE`` enabled has not responded within the observed
+    latency percentile of the endpoint, a second copy is sent and whichever
+    succeeds first is used while the other is cancelled. The second copy
+    goes through the rate limit bucket and the scheduler like any other
+    request.
+
+    Parameters
+    ----------
+    percentile: :class:`float`
+        The latency percentile after which a request is hedged.
+        Defaults to ``0.95``.
+    budget: :class:`float`
+        The max ratio of hedged requests to eligible requests. This makes
+        sure hedging can't double the load on a slow service.
+        Defaults to ``0.05``.
+    min_samples: :class:`int`
+        The amount of latencies needed for an endpoint before its
+        requests are hedged. Defaults to ``20``.
+    max_samples: :class:`int`
+        The amount of latest latencies kept per endpoint. Defaults to ``200``.
+    min_delay: :class:`float`
+        The minimum amount of seconds to wait before hedging.
+        Defaults to ``0.05``.
+
+    Attributes
+    ----------
+    requests: :class:`int`
+        The amount of requests eligible for hedging.
+    hedged: :class:`int`
+        The amount of requests that were hedged.
+    hedge_wins: :class:`int`
+        The amount of hedged requests where the second copy finished first.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        max_samples: int = 200,
+        min_delay: float = 0.05,
+    ) -> None:
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.min_delay = min_delay
+
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+        self._latencies = {}
+        self._recorded = {}
+        self._delays = {}
+
+    def record(self, key: tuple, latency: float) -> None:
+        try:
+            latencies = self._latencies[key]
+        except KeyError:
+            latencies = self._latencies[key] = deque(maxlen=self.max_samples)
+
+        latencies.append(latency)
+        recorded = self._recorded[key] = self._recorded.get(key, 0) + 1
+
+        count = len(latencies)
+        if count < self.min_samples:
+            return
+
+        # Sorting on every request is wasteful so the delay is only
+        # refreshed every tenth sample.
+        if key in self._delays and recorded % 10 != 0:
+            return
+
+        ordered = sorted(latencies)
+        index = min(int(count * self.percentile), count - 1)
+        self._delays[key] = max(ordered[index], self.min_delay)
+
+    def get_delay(self, key: tuple) -> Optional[float]:
+        """Returns the amount of seconds to wait before hedging a request
+        to an endpoint or ``None`` if not enough latencies are known yet.
+        """
+        return self._delays.get(key)
+
+    def acquire(self) -> bool:
+        if self.hedged >= self.requests * self.budget:
+            return False
+
+        self.hedged += 1
+        return True
+
+
+class GraphQLBatch:
+    __slots__ = ("entries", "size", "handle")
+
+    def __init__(self) -> None:
+        self.entries = []
+        self.size = 0
+        self.handle = None
+
+
+class GraphQLBatcher:
+    """Coalesces concurrent GraphQL requests into multi-operation posts.
+
+    Requests made within ``latency`` seconds of each other with the same
+    auth are sent together in one post of at most ``max_batch_size``
+    operations. The result or error of every operation is then passed
+    back to the caller that requested it.
+
+    Parameters
+    ----------
+    http: :class:`HTTPClient`
+        The http client used to send the batches.
+    max_batch_size: :class:`int`
+        The max amount of operations to send in one post.
+    latency: :class:`float`
+        How long to wait for more requests before a batch is sent. If
+        ``0``, the batch is sent on the next iteration of the event loop.
+
+    Attributes
+    ----------
+    batches: :class:`int`
+        The amount of posts sent by the batcher.
+    operations: :class:`int`
+        The amount of operations sent by the batcher.
+    """
+
+    def __init__(
+        self, http: "HTTPClient", max_batch_size: int = 10, latency: float = 0.0
+    ) -> None:
+        self.http = http
+        self.max_batch_size = max_batch_size
+        self.latency = latency
+
+        self.batches = 0
+        self.operations = 0
+
+        self._batches = {}
+
+    async def request(
+        self,
+        graphql: Union[GraphQLRequest, List[GraphQLRequest]],
+        auth: Optional[str] = None,
+        *,
+        partial: bool = False,
+    ) -> Any:
+        if isinstance(graphql, (list, tuple)):
+            operations = list(graphql)
+        else:
+            operations = [graphql]
+
+        # Too big to share a post with anything else.
+        if len(operations) >= self.max_batch_size:
+            return await self.http.fn_request(
+                "POST", EpicGamesGraphQL(), auth, graphql, partial=partial
             )
 
-    if transports == 0:
-        all_is_lost.set()
+        loop = asyncio.get_running_loop()
+
+        batch = self._batches.get(auth)
+        if batch is not None and batch.size + len(operations) > self.max_batch_size:
+            self.flush(auth)
+            batch = None
+
+        if batch is None:
+            batch = self._batches[auth] = GraphQLBatch()
+            if self.latency > 0:
+                batch.handle = loop.call_later(self.latency, self.flush, auth)
+            else:
+                batch.handle = loop.call_soon(self.flush, auth)
+
+        future = loop.create_future()
+        batch.entries.append((operations, future))
+        batch.size += len(operations)
+
+        if batch.size >= self.max_batch_size:
+            self.flush(auth)
+
+        results = await future
+        if partial:
+            return results
+
+        for result in results:
+            if isinstance(result, HTTPException):
+                raise result
 
-    return all_is_lost
+        if len(results) == 1:
+            return results[0]
+        return results
+
+    def flush(self, auth: Optional[str] = None) -> None:
+        batch = self._batches.pop(auth, None)
+        if batch is None:
+            return
+
+        batch.handle.cancel()
+        asyncio.ensure_future(self._send(auth, batch.entries))
+
+    async def _send(self, auth: Optional[str], entries: list) -> None:
+        graphql = [op for operations, _ in entries for op in operations]
+
+        self.batches += 1
+        self.operations += len(graphql)
+
+        # Errors of single operations are returned in place of their result
+        # and only reach the caller they belong to. Anything raised here
+        # failed the whole post and is therefore passed to every caller.
+        try:
+            results = await self.http.fn_request(
+                "POST", EpicGamesGraphQL(), auth, graphql, partial=True
+            )
+        except Exception as exc:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        offset = 0
+        for operations, future in entries:
+            end = offset + len(operations)
+            if not future.done():
+                future.set_result(results[offset:end])
+            offset = end
 
 
 class HTTPClient:
@@ -391,16 +1419,61 @@ class HTTPClient:
         *,
         connector: aiohttp.BaseConnector = None,
         retry_config: Optional[HTTPRetryConfig] = None,
+        coalesce_requests: bool = False,
+        response_cache: Optional[Union[bool, ResponseCache]] = None,
+        graphql_batch_size: Optional[int] = None,
+        graphql_batch_latency: float = 0.0,
+        scheduler: Optional[Union[bool, RequestScheduler]] = None,
+        circuit_breaker: Optional[Union[bool, CircuitBreaker]] = None,
+        transport: Optional[HTTPTransport] = None,
+        hedger: Optional[Union[bool, RequestHedger]] = None,
+        decode_threshold: Optional[int] = None,
     ) -> None:
         self.client = client
         self.connector = connector
+        self.transport = transport or AiohttpTransport()
+        if decode_threshold is not None:
+            self.transport.set_decode_threshold(decode_threshold)
         self.retry_config = retry_config or HTTPRetryConfig()
+        self.coalesce_requests = coalesce_requests
+
+        if response_cache is True:
+            response_cache = ResponseCache.shared()
+        self.response_cache = response_cache or None
+
+        if graphql_batch_size is not None:
+            self.graphql_batcher = GraphQLBatcher(
+                self,
+                max_batch_size=graphql_batch_size,
+                latency=graphql_batch_latency,
+            )
+        else:
+            self.graphql_batcher = None
+
+        if scheduler is True:
+            scheduler = RequestScheduler()
+        self.scheduler = scheduler or None
+
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker = circuit_breaker or None
+
+        if hedger is True:
+            hedger = RequestHedger()
+        self.hedger = hedger or None
+
+        # The amount of requests that were served by an identical request
+        # already in flight instead of being sent.
+        self.coalesced_requests = 0
 
         self._jar = aiohttp.CookieJar()
         self.headers = {}
+        self._headers_cache = {}
         self.device_id = self.client.auth.device_id
         self._endpoint_events = {}
-        self.__session = None
+        self._rate_limit_buckets = {}
+        self._inflight_requests = {}
+        self._transfer_stats = {}
 
         # How many refreshes (max_refresh_attempts) to attempt in
         # a time window (refresh_attempt_window) before closing.
@@ -409,82 +1482,99 @@ class HTTPClient:
 
     @staticmethod
     async def json_or_text(response: aiohttp.ClientResponse) -> Union[str, dict]:
-        text = await response.text(encoding="utf-8")
-        if "application/json" in response.headers.get("content-type", ""):
-            return json.loads(text)
-        return text
+        return await json_or_text(response)
 
     @property
     def user_agent(self) -> str:
         return "Fortnite/{0.client.build} {0.client.os}".format(self)
 
     def get_auth(self, auth: str) -> str:
-        u_auth = auth.upper()
-
-        if u_auth == "IOS_BASIC_TOKEN":
-            return "basic {0}".format(self.client.auth.ios_token)
-        elif u_auth == "FORTNITE_BASIC_TOKEN":
-            return "basic {0}".format(self.client.auth.fortnite_token)
-        elif u_auth == "IOS_ACCESS_TOKEN":
-            return self.client.auth.ios_authorization
-        elif u_auth == "FORTNITE_ACCESS_TOKEN":
-            return self.client.auth.authorization
-        return auth
+        try:
+            resolver = AUTH_PLACEHOLDERS[auth]
+        except KeyError:
+            try:
+                resolver = AUTH_PLACEHOLDERS[auth.upper()]
+            except KeyError:
+                return auth
+
+        return resolver(self.client.auth)
+
+    def get_headers(self, auth: Optional[str]) -> dict:
+        # Only placeholders are cached as the value of other auths like
+        # bearer tokens passed directly can be unique for every request.
+        cacheable = auth is None or auth in AUTH_PLACEHOLDERS
+        if cacheable:
+            try:
+                return self._headers_cache[auth].copy()
+            except KeyError:
+                pass
+
+        headers = self.headers.copy()
+        headers["User-Agent"] = self.user_agent
+        if auth is not None:
+            headers["Authorization"] = self.get_auth(auth)
+
+        if cacheable:
+            self._headers_cache[auth] = headers.copy()
+        return headers
+
+    def clear_headers_cache(self) -> None:
+        self._headers_cache.clear()
 
     def add_header(self, key: str, val: Any) -> None:
         self.headers[key] = val
+        self.clear_headers_cache()
 
     def remove_header(self, key: str) -> Any:
+        self.clear_headers_cache()
         return self.headers.pop(key)
 
     async def close(self) -> None:
         self._jar.clear()
-        if self.__session:
-            event = create_aiohttp_closed_event(self.__session)
-            await self.__session.close()
-            try:
-                await asyncio.wait_for(event.wait(), timeout=2)
-            except asyncio.TimeoutError:
-                pass
+        await self.transport.close()
 
     def connection_exists(self) -> bool:
-        return self.__session is not None
+        return self.transport.connection_exists()
 
     def create_connection(self) -> None:
-        self.__session = aiohttp.ClientSession(
-            connector=self.connector,
-            connector_owner=self.connector is None,
-            cookie_jar=self._jar,
-        )
+        self.transport.create_connection(self.connector, self._jar)
+
+    async def prewarm(self, urls: Iterable[str], *, timeout: float = 5) -> None:
+        # Opens a connection to every url by sending a HEAD request. The
+        # responses don't matter, only the pooled connections.
+        async def warm(url):
+            try:
+                await asyncio.wait_for(self.transport.request("HEAD", url), timeout)
+            except Exception as exc:
+                log.debug("Failed to prewarm {0}: {1!r}".format(url, exc))
+
+        await asyncio.gather(*(warm(url) for url in urls))
 
     async def request(
         self, method: str, url: str, **kwargs: Any
     ) -> Tuple[aiohttp.ClientResponse, Union[str, dict]]:
-        try:
-            params = kwargs["params"]
+        params = kwargs.get("params")
+        if params:
             if isinstance(params, dict):
-                kwargs["params"] = {
-                    k: (str(v).lower() if isinstance(v, bool) else v)
-                    for k, v in params.items()
-                }
-            else:
+                if any(isinstance(v, bool) for v in params.values()):
+                    kwargs["params"] = {
+                        k: (str(v).lower() if isinstance(v, bool) else v)
+                        for k, v in params.items()
+                    }
+            elif any(isinstance(v, bool) for _, v in params):
                 kwargs["params"] = [
                     (k, (str(v).lower() if isinstance(v, bool) else v))
                     for k, v in params
                 ]
-        except KeyError:
-            pass
 
         pre_time = time.time()
-        async with self.__session.request(method, url, **kwargs) as r:
-            log.debug(
-                "{0} {1} has returned {2.status} in {3:.2f}s".format(
-                    method, url, r, time.time() - pre_time
-                )
+        r, data = await self.transport.request(method, url, **kwargs)
+        log.debug(
+            "{0} {1} has returned {2.status} in {3:.2f}s".format(
+                method, url, r, time.time() - pre_time
             )
-
-            data = await self.json_or_text(r)
-            return r, data
+        )
+        return r, data
 
     async def _fn_request(
         self,
@@ -496,12 +1586,12 @@ class HTTPClient:
     ) -> Any:
         url = route.url if not isinstance(route, str) else route
 
-        headers = {**kwargs.get("headers", {}), **self.headers}
-        headers["User-Agent"] = self.user_agent
-
         auth = auth or route.AUTH
-        if auth is not None:
-            headers["Authorization"] = self.get_auth(auth)
+        headers = self.get_headers(auth)
+
+        extra_headers = kwargs.get("headers")
+        if extra_headers:
+            headers = {**extra_headers, **headers}
 
         device_id = kwargs.pop("device_id", None)
         if device_id is not None:
@@ -524,11 +1614,35 @@ class HTTPClient:
             pass
 
         raw = kwargs.pop("raw", False)
+        partial = kwargs.pop("partial", False)
+        cache_key = kwargs.pop("cache_key", None)
+        if cache_key is not None:
+            entry = self.response_cache.get(cache_key)
+            if entry is not None:
+                if entry.etag is not None:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified is not None:
+                    headers["If-Modified-Since"] = entry.last_modified
+
         r, data = await self.request(method, url, **kwargs)
+        self._update_rate_limit_bucket(method, route, r)
+        self._record_transfer(method, route, r)
 
         if raw:
             return r
 
+        if cache_key is not None and r.status < 400:
+            cache = self.response_cache
+            ttl = cache.get_ttl(route)
+            if r.status == 304 and entry is not None:
+                cache.revalidations += 1
+                data = entry.data
+            else:
+                cache.misses += 1
+
+            cache.set(cache_key, data, r.headers, ttl)
+            return data
+
         if graphql is not None:
             if isinstance(data, str):
                 m = GRAPHQL_HTML_ERROR_PATTERN.search(data)
@@ -539,7 +1653,7 @@ class HTTPClient:
                     },
                 )
                 if m is not None:
-                    error_data[0]["serviceResponse"] = json.dumps(
+                    error_data[0]["serviceResponse"] = codec.dumps(
                         {"errorStatus": int(m.group(2))}
                     )
 
@@ -548,10 +1662,31 @@ class HTTPClient:
                     message = data["message"]
                     error_data = (
                         {
-                            "serviceResponse": json.dumps({"errorCode": message}),
+                            "serviceResponse": codec.dumps({"errorCode": message}),
                             "message": message,
                         },
                     )
+            elif partial:
+                results = []
+                for child_data in data:
+                    if "errors" in child_data:
+                        exc = self._create_graphql_exception(
+                            r, route, child_data["errors"], headers
+                        )
+                        results.append(exc)
+                    else:
+                        results.append(get_graphql_payload(child_data))
+
+                # Only raise errors affecting the whole request, like auth or
+                # server errors, so that the retry logic can handle them.
+                # Errors of single operations, e.g. an account not being
+                # found, are returned in place of their result.
+                for res in results:
+                    if not isinstance(res, HTTPException):
+                        continue
+                    if self.is_request_failure(res):
+                        raise res
+                return results
             else:
                 error_data = None
                 for child_data in data:
@@ -560,33 +1695,11 @@ class HTTPClient:
                         break
 
             if error_data is not None:
-                selected = error_data[0]
-
-                obj = {"errorMessage": selected["message"]}
-                service_response = selected["serviceResponse"]
-                if service_response == "":
-                    error_payload = {}
-                else:
-                    error_payload = json.loads(service_response)
-
-                if isinstance(error_payload, str):
-                    m = GRAPHQL_HTML_ERROR_PATTERN.search(error_payload)
-                    message = "Unknown reason" if m is None else m.group(1)
-                    error_payload = {
-                        "errorMessage": message,
-                    }
-
-                    if m is not None:
-                        error_payload["errorStatus"] = int(m.group(2))
-
-                raise HTTPException(r, route, {**obj, **error_payload}, headers)
-
-            def get_payload(d):
-                return next(iter(d["data"].values()))
+                raise self._create_graphql_exception(r, route, error_data, headers)
 
             if len(data) == 1:
-                return get_payload(data[0])
-            return [get_payload(d) for d in data]
+                return get_graphql_payload(data[0])
+            return [get_graphql_payload(d) for d in data]
 
         if "errorCode" in data or r.status >= 400:
             if isinstance(data, str):
@@ -595,6 +1708,309 @@ class HTTPClient:
 
         return data
 
+    async def _request_attempt(
+        self,
+        method: str,
+        route: Union[Route, str],
+        auth: Optional[str],
+        graphql: Optional[Union[Route, List[Route]]],
+        base: str,
+        priority_class: Optional[str],
+        **kwargs: Any,
+    ) -> Any:
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            probe = breaker.before_request(base)
+
+        failed = None
+        try:
+            scheduler = self.scheduler
+            if scheduler is None:
+                data = await self._send_request(
+                    method, route, auth, graphql, base, priority_class, **kwargs
+                )
+            else:
+                waited = await scheduler.acquire(base, priority_class)
+                if waited > 0.01:
+                    log.debug(
+                        "Scheduler delayed {0} {1} ({2}) by {3:.2f}s.".format(
+                            method, base, priority_class, waited
+                        )
+                    )
+
+                try:
+                    data = await self._send_request(
+                        method, route, auth, graphql, base, priority_class, **kwargs
+                    )
+                finally:
+                    scheduler.release(base)
+        except HTTPException as exc:
+            failed = self.is_service_failure(exc, graphql)
+            raise
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            failed = True
+            raise
+        else:
+            failed = False
+            return data
+        finally:
+            if breaker is not None:
+                state = breaker.record(base, failed, probe)
+                if state == "open":
+                    log.debug("Circuit opened for {0}.".format(base))
+                    self.client.dispatch_event("service_unavailable", base)
+                elif state == "closed":
+                    log.debug("Circuit closed for {0}.".format(base))
+                    self.client.dispatch_event("service_recover", base)
+
+    async def _send_request(
+        self,
+        method: str,
+        route: Union[Route, str],
+        auth: Optional[str],
+        graphql: Optional[Union[Route, List[Route]]],
+        base: str,
+        priority_class: Optional[str],
+        **kwargs: Any,
+    ) -> Any:
+        hedger = self.hedger
+        if (
+            hedger is None
+            or method != "GET"
+            or not isinstance(route, Route)
+            or not route.HEDGE
+            or kwargs.get("raw")
+        ):
+            return await self._fn_request(method, route, auth, graphql, **kwargs)
+
+        key = (method, route.sanitized_url)
+        hedger.requests += 1
+
+        async def timed(first=False):
+            started_at = time.monotonic()
+            try:
+                data = await self._fn_request(method, route, auth, graphql, **kwargs)
+            except asyncio.CancelledError:
+                # If the first copy loses, its elapsed time is a lower bound
+                # of a slow response, so leaving it out would bias the
+                # percentile down. The elapsed time of a losing second copy
+                # says nothing as it only started after the hedge delay.
+                if first:
+                    hedger.record(key, time.monotonic() - started_at)
+                raise
+
+            hedger.record(key, time.monotonic() - started_at)
+            return data
+
+        bucket = self.get_rate_limit_bucket(method, route)
+        scheduler = self.scheduler
+
+        async def hedge():
+            # The second copy is a real request so it has to take a token
+            # and a scheduler slot just like the first one did.
+            if bucket is not None:
+                await bucket.acquire()
+            if scheduler is None:
+                return await timed()
+
+            await scheduler.acquire(base, priority_class)
+            try:
+                return await timed()
+            finally:
+                scheduler.release(base)
+
+        first = asyncio.ensure_future(timed(first=True))
+        tasks = {first}
+        try:
+            delay = hedger.get_delay(key)
+            if delay is None:
+                return await first
+
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return await first
+
+            # Hedging while the bucket is empty would only delay the copy
+            # until the first request has most likely finished anyway.
+            if bucket is not None and bucket.get_delay() > 0:
+                return await first
+            if not hedger.acquire():
+                return await first
+
+            log.debug(
+                "Hedging {0} {1} after {2:.2f}s.".format(method, route.url, delay)
+            )
+            second = asyncio.ensure_future(hedge())
+            tasks.add(second)
+
+            pending = tasks
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            hedger.hedge_wins += 1
+                        return task.result()
+
+                # Both copies failed.
+                if not pending:
+                    return task.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @staticmethod
+    def is_service_failure(
+        exc: HTTPException, graphql: Optional[Union[Route, List[Route]]] = None
+    ) -> bool:
+        if exc.status >= 500:
+            return True
+        if exc.message_code == "errors.com.epicgames.common.server_error":
+            return True
+        if graphql and isinstance(exc.raw, dict):
+            return exc.raw.get("errorStatus") in {500, 502, 503}
+        return False
+
+    @staticmethod
+    def is_request_failure(exc: HTTPException) -> bool:
+        """Whether a GraphQL operation error is caused by the request itself
+        failing (auth, throttling or server errors) rather than by the
+        operation.
+        """
+        if exc.message_code in GRAPHQL_REQUEST_ERROR_CODES:
+            return True
+
+        status = exc.raw.get("errorStatus")
+        return isinstance(status, int) and (status == 429 or status >= 500)
+
+    def _create_graphql_exception(
+        self,
+        r: aiohttp.ClientResponse,
+        route: Union[Route, str],
+        error_data: List[dict],
+        headers: dict,
+    ) -> HTTPException:
+        selected = error_data[0]
+
+        obj = {"errorMessage": selected["message"]}
+        service_response = selected["serviceResponse"]
+        if service_response == "":
+            error_payload = {}
+        else:
+            error_payload = codec.loads(service_response)
+
+        if isinstance(error_payload, str):
+            m = GRAPHQL_HTML_ERROR_PATTERN.search(error_payload)
+            message = "Unknown reason" if m is None else m.group(1)
+            error_payload = {
+                "errorMessage": message,
+            }
+
+            if m is not None:
+                error_payload["errorStatus"] = int(m.group(2))
+
+        return HTTPException(r, route, {**obj, **error_payload}, headers)
+
+    def _record_transfer(
+        self, method: str, route: Union[Route, str], r: aiohttp.ClientResponse
+    ) -> None:
+        compressed = getattr(r, "compressed_size", None)
+        if compressed is None:
+            return
+
+        if isinstance(route, Route):
+            key = "{0} {1}".format(method, route.sanitized_url)
+        else:
+            key = "{0} {1}".format(method, route)
+
+        try:
+            stats = self._transfer_stats[key]
+        except KeyError:
+            stats = self._transfer_stats[key] = [0, 0, 0]
+
+        stats[0] += 1
+        stats[1] += compressed
+        stats[2] += r.decompressed_size
+
+    def get_transfer_stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the amount of requests and the amount of bytes received
+        before (``compressed_bytes``) and after (``decompressed_bytes``)
+        decompression, mapped by ``METHOD url`` where the url is the
+        unformatted url of the route.
+        """
+        return {
+            key: {
+                "requests": requests,
+                "compressed_bytes": compressed,
+                "decompressed_bytes": decompressed,
+            }
+            for key, (requests, compressed, decompressed) in (
+                self._transfer_stats.items()
+            )
+        }
+
+    def get_rate_limit_bucket(
+        self, method: str, route: Union[Route, str]
+    ) -> Optional[RateLimitBucket]:
+        if not self.retry_config.proactive_rate_limits:
+            return None
+        if not isinstance(route, Route):
+            return None
+
+        url_key = (method, route.sanitized_url)
+        try:
+            return self._rate_limit_buckets[url_key]
+        except KeyError:
+            pass
+
+        # Limits set by the user are kept as is while the defaults of the
+        # routes are replaced by the limits the service reports.
+        rate_limit = self.retry_config.rate_limits.get(type(route))
+        if rate_limit is not None:
+            bucket = RateLimitBucket(*rate_limit, adaptive=False)
+        elif route.RATE_LIMIT is not None:
+            bucket = RateLimitBucket(*route.RATE_LIMIT)
+        else:
+            bucket = RateLimitBucket()
+
+        self._rate_limit_buckets[url_key] = bucket
+        return bucket
+
+    def _update_rate_limit_bucket(
+        self, method: str, route: Union[Route, str], r: aiohttp.ClientResponse
+    ) -> None:
+        bucket = self.get_rate_limit_bucket(method, route)
+        if bucket is None:
+            return
+
+        headers = r.headers
+
+        def get_header(key, type_):
+            value = headers.get(key)
+            if value is None:
+                return None
+
+            try:
+                return type_(value)
+            except ValueError:
+                return None
+
+        limit = get_header("X-RateLimit-Limit", int)
+        remaining = get_header("X-RateLimit-Remaining", int)
+        reset = get_header("X-RateLimit-Reset", float)
+        if reset is not None and reset > 1e9:
+            # Some services send the reset as an unix timestamp rather
+            # than seconds until reset.
+            reset = max(reset - time.time(), 0)
+
+        if limit is None and remaining is None:
+            return
+
+        bucket.update(limit=limit, remaining=remaining, reset_after=reset)
+
     def get_retry_after(self, exc: HTTPException) -> Optional[int]:
         retry_after = exc.response.headers.get("Retry-After")
         if retry_after is not None:
@@ -608,6 +2024,135 @@ class HTTPClient:
         except (ValueError, IndexError):
             return None
 
+    def _get_coalesce_key(
+        self,
+        method: str,
+        route: Union[Route, str],
+        auth: Optional[str],
+        kwargs: dict,
+    ) -> Optional[tuple]:
+        if not self.coalesce_requests or method != "GET":
+            return None
+        if kwargs.get("raw", False):
+            return None
+
+        url = route.url if isinstance(route, Route) else route
+        if auth is None and isinstance(route, Route):
+            auth = route.AUTH
+
+        return (
+            method,
+            url,
+            repr(kwargs.get("params")),
+            auth,
+            repr(kwargs.get("headers")),
+            kwargs.get("device_id"),
+        )
+
+    async def _coalesced_request(self, key: tuple, *args: Any, **kwargs: Any) -> Any:
+        try:
+            entry = self._inflight_requests[key]
+        except KeyError:
+            task = asyncio.ensure_future(self._fn_request_with_retries(*args, **kwargs))
+            entry = self._inflight_requests[key] = [task, 0]
+
+            def on_done(*_):
+                if self._inflight_requests.get(key) is entry:
+                    del self._inflight_requests[key]
+
+            task.add_done_callback(on_done)
+        else:
+            self.coalesced_requests += 1
+            log.debug("Coalesced {0} {1} with an in-flight request.".format(*key))
+
+        entry[1] += 1
+        result = await asyncio.shield(entry[0])
+
+        # The payload is shared between all waiters, so each of them gets
+        # their own copy to freely mutate.
+        if entry[1] > 1:
+            return copy.deepcopy(result)
+        return result
+
+    async def _cached_request(
+        self,
+        method: str,
+        route: Route,
+        auth: Optional[str],
+        priority: int,
+        **kwargs: Any,
+    ) -> Any:
+        cache = self.response_cache
+        headers = {**(kwargs.get("headers") or {}), **self.headers}
+        key = cache.get_key(route, kwargs.get("params"), headers)
+
+        entry = cache.get(key)
+        if entry is not None and not entry.is_expired():
+            cache.hits += 1
+            return entry.data
+
+        # Clients sharing the cache also share the request for an entry.
+        try:
+            task, owner = cache._pending[key]
+        except KeyError:
+            if entry is not None and not entry.can_revalidate():
+                cache.remove(key)
+
+            task = self._start_cached_request(
+                key, method, route, auth, priority, kwargs
+            )
+            owner = self
+        else:
+            cache.hits += 1
+
+        if owner is self:
+            return await asyncio.shield(task)
+
+        try:
+            return await asyncio.shield(task)
+        except HTTPException:
+            raise
+        except (Exception, asyncio.CancelledError):
+            # The shared request runs on the client that started it. If that
+            # client failed it on its own, e.g. because it closed or
+            # restarted, the request is done again with this client.
+            if not task.done() or self.client.is_closed():
+                raise
+
+        pending = cache._pending.get(key)
+        if pending is not None and pending[1] is self:
+            task = pending[0]
+        else:
+            task = self._start_cached_request(
+                key, method, route, auth, priority, kwargs
+            )
+        return await asyncio.shield(task)
+
+    def _start_cached_request(
+        self,
+        key: tuple,
+        method: str,
+        route: Route,
+        auth: Optional[str],
+        priority: int,
+        kwargs: dict,
+    ) -> asyncio.Task:
+        cache = self.response_cache
+        task = asyncio.ensure_future(
+            self._fn_request_with_retries(
+                method, route, auth, None, priority, cache_key=key, **kwargs
+            )
+        )
+        cache._pending[key] = (task, self)
+
+        def on_done(*_):
+            pending = cache._pending.get(key)
+            if pending is not None and pending[0] is task:
+                del cache._pending[key]
+
+        task.add_done_callback(on_done)
+        return task
+
     async def fn_request(
         self,
         method: str,
@@ -620,6 +2165,101 @@ class HTTPClient:
         if self.client.is_closed():
             raise RuntimeError("Client is closed.")
 
+        deadline = kwargs.pop("deadline", None)
+        timeout = kwargs.pop("timeout", None)
+        if timeout is not None:
+            loop_deadline = asyncio.get_running_loop().time() + timeout
+            if deadline is None or loop_deadline < deadline:
+                deadline = loop_deadline
+
+        if graphql is None and self.response_cache is not None:
+            ttl = self.response_cache.get_ttl(route)
+            if ttl is not None and method == "GET" and not kwargs.get("raw"):
+                return await self._wait_until(
+                    self._cached_request(method, route, auth, priority, **kwargs),
+                    deadline,
+                )
+
+        if graphql is None:
+            key = self._get_coalesce_key(method, route, auth, kwargs)
+            if key is not None:
+                return await self._wait_until(
+                    self._coalesced_request(
+                        key, method, route, auth, graphql, priority, **kwargs
+                    ),
+                    deadline,
+                )
+
+        return await self._fn_request_with_retries(
+            method, route, auth, graphql, priority, deadline=deadline, **kwargs
+        )
+
+    @staticmethod
+    async def _wait_until(aw: Awaitable, deadline: Optional[float]) -> Any:
+        if deadline is None:
+            return await aw
+
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            raise asyncio.TimeoutError()
+
+        return await asyncio.wait_for(aw, remaining)
+
+    @staticmethod
+    def _check_budget(deadline: Optional[float], wait: float) -> None:
+        if deadline is None:
+            return
+
+        if asyncio.get_running_loop().time() + wait >= deadline:
+            raise asyncio.TimeoutError()
+
+    def _finish_refresh(
+        self, refresh: asyncio.Future, exc: HTTPException
+    ) -> asyncio.Future:
+        # Handles the outcome of a refresh that the request which started
+        # it stopped waiting for, the same way as if it had waited.
+        async def finish():
+            lock = self.client._reauth_lock
+            try:
+                await refresh
+            except asyncio.CancelledError:
+                lock.failed = True
+            except Exception:
+                if self.client.can_restart():
+                    try:
+                        await self.client.restart()
+                        return
+                    except Exception as e:
+                        log.debug(
+                            "Restart after a failed refresh failed: {0!r}".format(e)
+                        )
+
+                lock.failed = True
+            else:
+                return
+
+            try:
+                e = RuntimeError("Oauth token invalid.")
+                e.__cause__ = exc
+                self.client._exception_future.set_exception(e)
+            except asyncio.InvalidStateError:
+                pass
+
+        return asyncio.ensure_future(finish())
+
+    async def _fn_request_with_retries(
+        self,
+        method: str,
+        route: Union[Route, str],
+        auth: Optional[str] = None,
+        graphql: Union[Route, List[Route]] = None,
+        priority: int = 0,
+        *,
+        deadline: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
         cfg = self.retry_config
         if isinstance(route, Route):
             url = route.url
@@ -628,6 +2268,22 @@ class HTTPClient:
             url = route
             url_key = None
 
+        priority_class = kwargs.pop("priority_class", None)
+        if isinstance(route, Route):
+            base = route.base
+        else:
+            parts = urlsplit(route)
+            base = "{0.scheme}://{0.netloc}".format(parts)
+
+        if self.scheduler is not None:
+            if priority_class is None:
+                if priority > 0:
+                    priority_class = "auth"
+                elif isinstance(route, Route):
+                    priority_class = route.PRIORITY_CLASS
+                else:
+                    priority_class = "bulk"
+
         tries = 0
         total_slept = 0
         backoff = cfg.backoff_start
@@ -644,18 +2300,36 @@ class HTTPClient:
                         url,
                     )
                 )
-                await endpoint_event.wait()
+                self._check_budget(deadline, endpoint_event.ends_at - time.time())
+                await self._wait_until(endpoint_event.wait(), deadline)
 
             endpoint_event = None
 
+            bucket = self.get_rate_limit_bucket(method, route)
+            if bucket is not None:
+                delay = bucket.get_delay()
+                if delay > 0:
+                    log.debug(
+                        "Proactively waiting {0:.2f}s before requesting "
+                        "{1} {2}.".format(delay, method, url)
+                    )
+                    self._check_budget(deadline, delay)
+
+                await self._wait_until(bucket.acquire(), deadline)
+
             lock = self.client._reauth_lock
             if priority <= 0:
-                await lock.wait()
+                await self._wait_until(lock.wait(), deadline)
                 if lock.failed:
                     raise asyncio.CancelledError("Client is shutting down.")
 
             try:
-                return await self._fn_request(method, route, auth, graphql, **kwargs)
+                return await self._wait_until(
+                    self._request_attempt(
+                        method, route, auth, graphql, base, priority_class, **kwargs
+                    ),
+                    deadline,
+                )
             except HTTPException as exc:
                 if self.client._closing:
                     raise
@@ -696,11 +2370,30 @@ class HTTPClient:
                             return cur - old > self.refresh_attempt_window
 
                     if priority > lock.priority - 1:
-                        async with MaybeLock(lock):
+                        async with MaybeLock(lock) as maybe_lock:
                             if should_force():
+                                refresh = asyncio.ensure_future(
+                                    self.client.auth.do_refresh()
+                                )
                                 try:
-                                    await self.client.auth.do_refresh()
+                                    await self._wait_until(
+                                        asyncio.shield(refresh), deadline
+                                    )
+                                except asyncio.TimeoutError:
+                                    # The request ran out of time while the
+                                    # refresh goes on. Keep other requests
+                                    # waiting for it by handing the lock over.
+                                    maybe_lock.release_when_done(
+                                        self._finish_refresh(refresh, exc)
+                                    )
+                                    raise
                                 except asyncio.CancelledError:
+                                    if not refresh.cancelled():
+                                        maybe_lock.release_when_done(
+                                            self._finish_refresh(refresh, exc)
+                                        )
+                                        raise
+
                                     lock.failed = True
                                     retry = False
                                 except Exception:
@@ -713,7 +2406,7 @@ class HTTPClient:
                                 retry = False
                     else:
                         if lock.locked():
-                            await lock.wait()
+                            await self._wait_until(lock.wait(), deadline)
                             if lock.failed:
                                 raise asyncio.CancelledError("Client is shutting down.")
                         else:
@@ -738,6 +2431,9 @@ class HTTPClient:
                     if retry_after is not None and cfg.handle_rate_limits:
                         if retry_after <= cfg.max_retry_after:
                             sleep_time = retry_after + 0.5
+                            bucket = self.get_rate_limit_bucket(method, route)
+                            if bucket is not None:
+                                bucket.block(sleep_time)
                             if cfg.other_requests_wait and url_key is not None:
                                 if url_key not in self._endpoint_events:
                                     endpoint_event = asyncio.Event()
@@ -762,6 +2458,11 @@ class HTTPClient:
                     if cfg.max_wait_time and total_slept > cfg.max_wait_time:
                         raise
 
+                    try:
+                        self._check_budget(deadline, sleep_time)
+                    except asyncio.TimeoutError as e:
+                        raise e from exc
+
                     log.debug(
                         "Retrying {0} {1} in {2:.2f}s.".format(method, url, sleep_time)
                     )
@@ -770,7 +2471,9 @@ class HTTPClient:
                 raise
 
             except aiohttp.ServerDisconnectedError:
-                await asyncio.sleep(0.5 + (tries - 1) * 2)
+                sleep_time = 0.5 + (tries - 1) * 2
+                self._check_budget(deadline, sleep_time)
+                await asyncio.sleep(sleep_time)
                 continue
             except OSError as exc:
                 if exc.errno in (54, 10054):
@@ -813,6 +2516,10 @@ class HTTPClient:
         auth: Optional[str] = None,
         **kwargs: Any,
     ) -> Any:
+        # Requests with extra options like a priority are sent on their own.
+        if self.graphql_batcher is not None and set(kwargs) <= {"partial"}:
+            return await self.graphql_batcher.request(graphql, auth, **kwargs)
+
         return await self.fn_request(
             "POST", EpicGamesGraphQL(), auth, graphql, **kwargs
         )
@@ -983,11 +2690,13 @@ class HTTPClient:
     ###################################
 
     async def account_get_exchange_data(self, auth: str, **kwargs: Any) -> dict:
-        r = AccountPublicService("/account/api/oauth/exchange")
+        r = AccountPublicService(
+            "/account/api/oauth/exchange", priority_class="auth", hedge=False
+        )
         return await self.get(r, auth=auth, **kwargs)
 
     async def account_oauth_grant(self, **kwargs: Any) -> dict:
-        r = AccountPublicService("/account/api/oauth/token")
+        r = AccountPublicService("/account/api/oauth/token", priority_class="auth")
         return await self.post(r, **kwargs)
 
     async def account_put_date_of_birth_correction(
@@ -1113,10 +2822,11 @@ class HTTPClient:
             **kwargs,
         )
 
-    async def account_graphql_get_by_display_name(self, display_name: str) -> dict:
-        return await self.graphql_request(
-            GraphQLRequest(
-                query="""
+    def _account_graphql_display_name_request(
+        self, display_name: str
+    ) -> GraphQLRequest:
+        return GraphQLRequest(
+            query="""
             query AccountQuery($displayName: String!) {
                 Account {
                     account(displayName: $displayName) {
@@ -1132,8 +2842,23 @@ class HTTPClient:
                 }
             }
             """,
-                variables={"displayName": display_name},
-            )
+            variables={"displayName": display_name},
+        )
+
+    async def account_graphql_get_by_display_name(self, display_name: str) -> dict:
+        return await self.graphql_request(
+            self._account_graphql_display_name_request(display_name)
+        )
+
+    async def account_graphql_get_multiple_by_display_name(
+        self, display_names: List[str], **kwargs: Any
+    ) -> List[Union[dict, HTTPException]]:
+        # Every operation in the batch gets its own result. Failed
+        # operations are returned as exceptions instead of being raised.
+        return await self.graphql_request(
+            [self._account_graphql_display_name_request(dn) for dn in display_names],
+            partial=True,
+            **kwargs,
         )
 
     ###################################
@@ -1478,7 +3203,7 @@ class HTTPClient:
                 "urn:epic:member:dn_s": self.client.user.display_name,
                 "urn:epic:member:type_s": conn_type,
                 "urn:epic:member:platform_s": self.client.platform.value,
-                "urn:epic:member:joinrequest_j": json.dumps(
+                "urn:epic:member:joinrequest_j": codec.dumps(
                     {"CrossplayPreference_i": "1"}
                 ),
             },
@@ -1506,14 +3231,14 @@ class HTTPClient:
             },
             "meta": {
                 "urn:epic:member:dn_s": self.client.user.display_name,
-                "urn:epic:member:joinrequestusers_j": json.dumps(
+                "urn:epic:member:joinrequestusers_j": codec.dumps(
                     {
                         "users": [
                             {
                                 "id": self.client.user.id,
                                 "dn": self.client.user.display_name,
                                 "plat": self.client.platform.value,
-                                "data": json.dumps(
+                                "data": codec.dumps(
                                     {
                                         "CrossplayPreference": "1",
                                         "SubGame_u": "1",
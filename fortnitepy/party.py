@@ -22,7 +22,6 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import json
 import asyncio
 import aioxmpp
 import re
@@ -43,6 +42,7 @@ from typing import (
 )
 from collections import OrderedDict
 
+from . import codec
 from .enums import Enum
 from .errors import PartyError, Forbidden, HTTPException, NotFound
 from .user import User
@@ -530,7 +530,7 @@ class MetaBase:
 
         _t = prop[-1:]
         if _t == "j":
-            self.schema[prop] = json.dumps(value)
+            self.schema[prop] = codec.dumps(value)
         elif _t == "U":
             self.schema[prop] = int(value)
         else:
@@ -546,7 +546,7 @@ class MetaBase:
         if _t == "b":
             return not (_v is None or (isinstance(_v, str) and _v.lower() == "false"))
         elif _t == "j":
-            return {} if _v is None else json.loads(_v)
+            return {} if _v is None else codec.loads(_v)
         elif _t == "U":
             return 0 if _v is None else int(_v)
         else:
@@ -589,7 +589,7 @@ class PartyMemberMeta(MetaBase):
         self.def_character = DefaultCharactersChapter2.get_random_name()
         self.schema = {
             "Default:Location_s": "PreLobby",
-            "Default:CampaignHero_j": json.dumps(
+            "Default:CampaignHero_j": codec.dumps(
                 {
                     "CampaignHero": {
                         "heroItemInstanceId": "",
@@ -601,7 +601,7 @@ class PartyMemberMeta(MetaBase):
                     },
                 }
             ),
-            "Default:CampaignInfo_j": json.dumps(
+            "Default:CampaignInfo_j": codec.dumps(
                 {
                     "CampaignInfo": {
                         "matchmakingLevel": 0,
@@ -613,7 +613,7 @@ class PartyMemberMeta(MetaBase):
             "Default:MatchmakingLevel_U": "0",
             "Default:ZoneInstanceId_s": "",
             "Default:HomeBaseVersion_U": "1",
-            "Default:FrontendEmote_j": json.dumps(
+            "Default:FrontendEmote_j": codec.dumps(
                 {
                     "FrontendEmote": {
                         "emoteItemDef": "None",
@@ -624,7 +624,7 @@ class PartyMemberMeta(MetaBase):
             ),
             "Default:NumAthenaPlayersLeft_U": "0",
             "Default:UtcTimeStartedMatchAthena_s": "0001-01-01T00:00:00.000Z",
-            "Default:LobbyState_j": json.dumps(
+            "Default:LobbyState_j": codec.dumps(
                 {
                     "LobbyState": {
                         "inGameReadyCheckStatus": None,
@@ -636,7 +636,7 @@ class PartyMemberMeta(MetaBase):
                     },
                 }
             ),
-            "Default:FrontEndMapMarker_j": json.dumps(
+            "Default:FrontEndMapMarker_j": codec.dumps(
                 {
                     "FrontEndMapMarker": {
                         "markerLocation": {
@@ -647,7 +647,7 @@ class PartyMemberMeta(MetaBase):
                     }
                 }
             ),
-            "Default:AssistedChallengeInfo_j": json.dumps(
+            "Default:AssistedChallengeInfo_j": codec.dumps(
                 {
                     "AssistedChallengeInfo": {
                         "questItemDef": "None",
@@ -655,7 +655,7 @@ class PartyMemberMeta(MetaBase):
                     },
                 }
             ),
-            "Default:MemberSquadAssignmentRequest_j": json.dumps(
+            "Default:MemberSquadAssignmentRequest_j": codec.dumps(
                 {
                     "MemberSquadAssignmentRequest": {
                         "startingAbsoluteIdx": -1,
@@ -665,7 +665,7 @@ class PartyMemberMeta(MetaBase):
                     },
                 }
             ),
-            "Default:AthenaCosmeticLoadout_j": json.dumps(
+            "Default:AthenaCosmeticLoadout_j": codec.dumps(
                 {
                     "AthenaCosmeticLoadout": {
                         "characterDef": (
@@ -688,13 +688,13 @@ class PartyMemberMeta(MetaBase):
                     },
                 }
             ),
-            "Default:AthenaCosmeticLoadoutVariants_j": json.dumps(
+            "Default:AthenaCosmeticLoadoutVariants_j": codec.dumps(
                 {"AthenaCosmeticLoadoutVariants": {"vL": {}}}
             ),
-            "Default:ArbitraryCustomDataStore_j": json.dumps(
+            "Default:ArbitraryCustomDataStore_j": codec.dumps(
                 {"ArbitraryCustomDataStore": []}
             ),
-            "Default:AthenaBannerInfo_j": json.dumps(
+            "Default:AthenaBannerInfo_j": codec.dumps(
                 {
                     "AthenaBannerInfo": {
                         "bannerIconId": "standardbanner15",
@@ -703,7 +703,7 @@ class PartyMemberMeta(MetaBase):
                     },
                 }
             ),
-            "Default:BattlePassInfo_j": json.dumps(
+            "Default:BattlePassInfo_j": codec.dumps(
                 {
                     "BattlePassInfo": {
                         "bHasPurchasedPass": False,
@@ -713,7 +713,7 @@ class PartyMemberMeta(MetaBase):
                     },
                 }
             ),
-            "Default:PlatformData_j": json.dumps(
+            "Default:PlatformData_j": codec.dumps(
                 {
                     "PlatformData": {
                         "platform": {
@@ -1141,14 +1141,14 @@ class PartyMeta(MetaBase):
             "Default:ZoneInstanceId_s": "",
             "Default:SpectateAPartyMemberAvailable_b": "false",
             "Default:TheaterId_s": "",
-            "Default:TileStates_j": json.dumps(
+            "Default:TileStates_j": codec.dumps(
                 {
                     "TileStates": [],
                 }
             ),
             "Default:MatchmakingInfoString_s": "",
             "Default:CustomMatchKey_s": "",
-            "Default:PlaylistData_j": json.dumps(
+            "Default:PlaylistData_j": codec.dumps(
                 {
                     "PlaylistData": {
                         "playlistName": "Playlist_DefaultDuo",
@@ -1163,18 +1163,18 @@ class PartyMeta(MetaBase):
             "Default:LFGTime_s": "0001-01-01T00:00:00.000Z",
             "Default:PartyIsJoinedInProgress_b": "false",
             "Default:GameSessionKey_s": "",
-            "Default:RawSquadAssignments_j": json.dumps({"RawSquadAssignments": []}),
-            "Default:PrivacySettings_j": json.dumps(
+            "Default:RawSquadAssignments_j": codec.dumps({"RawSquadAssignments": []}),
+            "Default:PrivacySettings_j": codec.dumps(
                 {
                     "PrivacySettings": privacy_settings,
                 }
             ),
-            "Default:PlatformSessions_j": json.dumps(
+            "Default:PlatformSessions_j": codec.dumps(
                 {
                     "PlatformSessions": [],
                 }
             ),
-            "Default:PartyMatchmakingInfo_j": json.dumps(
+            "Default:PartyMatchmakingInfo_j": codec.dumps(
                 {
                     "PartyMatchmakingInfo": {
                         "buildId": -1,
@@ -3227,7 +3227,7 @@ class PartyBase:
 
         if _update_squad_assignments:
             if self.leader.id != self.client.user.id:
-                _assignments = json.loads(_assignments)["RawSquadAssignments"]
+                _assignments = codec.loads(_assignments)["RawSquadAssignments"]
                 self._update_squad_assignments(_assignments)
 
     def _update_roles(self, new_leader: PartyMemberBase) -> None:
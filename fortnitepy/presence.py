@@ -25,9 +25,10 @@ SOFTWARE.
 """
 
 import re
+import asyncio
 import datetime
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Iterable, Callable, Union, Any
 
 from .errors import Forbidden, PartyError
 from .enums import Platform
@@ -398,3 +399,139 @@ class Presence:
             "<Presence friend={0.friend!r} available={0.available} "
             "received_at={0.received_at!r}>".format(self)
         )
+
+
+class PresenceFilter:
+    """Decides which friend presences the client should process. Presences
+    that don't pass the filter are dropped straight after being received,
+    before their status is decoded and before a :class:`Presence` is
+    constructed.
+
+    Parameters
+    ----------
+    user_ids: Optional[Iterable[:class:`str`]]
+        The ids of the friends to process presences from. Defaults to
+        ``None`` which means presences from all friends are processed.
+    platforms: Optional[Iterable[Union[:class:`Platform`, :class:`str`]]]
+        The platforms to process presences from. Defaults to ``None`` which
+        means presences from all platforms are processed.
+    check: Optional[Callable]
+        A predicate called with the raw fields of the presence: the user
+        id, the platform string (e.g. ``WIN``), the presence type and the
+        away status string. The presence is only processed if it returns
+        ``True``.
+
+        .. warning::
+
+            The predicate is called for every presence received so it must
+            be cheap and it should never block.
+    """
+
+    __slots__ = ("user_ids", "platforms", "check")
+
+    def __init__(
+        self,
+        user_ids: Optional[Iterable[str]] = None,
+        platforms: Optional[Iterable[Union[Platform, str]]] = None,
+        check: Optional[Callable[..., bool]] = None,
+    ) -> None:
+        self.user_ids = frozenset(user_ids) if user_ids is not None else None
+        self.platforms = (
+            frozenset(p.value if isinstance(p, Platform) else p for p in platforms)
+            if platforms is not None
+            else None
+        )
+        self.check = check
+
+    def __repr__(self) -> str:
+        return (
+            "<PresenceFilter user_ids={0.user_ids!r} platforms={0.platforms!r} "
+            "check={0.check!r}>".format(self)
+        )
+
+    def matches(
+        self, user_id: str, platform: str, type_: Optional[str], show: Optional[str]
+    ) -> bool:
+        """Checks if a presence with the raw fields passed should be
+        processed.
+
+        Returns
+        -------
+        :class:`bool`
+        """
+        if self.user_ids is not None and user_id not in self.user_ids:
+            return False
+        if self.platforms is not None and platform not in self.platforms:
+            return False
+        if self.check is not None:
+            return bool(self.check(user_id, platform, type_, show))
+        return True
+
+
+class PresenceCoalescer:
+    """Buffers received presences for a short window and only processes
+    the latest presence of each friend once the window has passed. This
+    keeps bursts of presences, like the ones sent by friends in a match,
+    from spawning a task for every single presence.
+
+    Parameters
+    ----------
+    window: :class:`float`
+        How many seconds presences are buffered for.
+
+    Attributes
+    ----------
+    received: :class:`int`
+        The amount of presences buffered.
+    dropped: :class:`int`
+        The amount of presences dropped because a newer presence from the
+        same friend was received within the window.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self.received = 0
+        self.dropped = 0
+
+        self._pending = {}
+        self._handle = None
+
+    def add(self, user_id: str, callback: Callable, *args: Any) -> None:
+        self.received += 1
+        if user_id in self._pending:
+            self.dropped += 1
+
+        self._pending[user_id] = (callback, args)
+        if self._handle is None:
+            loop = asyncio.get_running_loop()
+            self._handle = loop.call_later(self.window, self._flush)
+
+    def _flush(self) -> None:
+        self._handle = None
+
+        pending = self._pending
+        self._pending = {}
+        for callback, args in pending.values():
+            callback(*args)
+
+    def clear(self) -> None:
+        """Drops all buffered presences without processing them."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        self._pending = {}
+
+    def get_stats(self) -> dict:
+        """Returns the amount of presences ``received``, ``dropped`` and
+        currently ``pending``.
+
+        Returns
+        -------
+        :class:`dict`
+        """
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,538 @@
+"""
+MIT License
+
+Copyright (c) 2019-2021 Terbau
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import functools
+import gzip
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from collections import deque
+from http.cookies import SimpleCookie
+from typing import Any, Generator, Optional, Tuple
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from . import codec
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+log = logging.getLogger(__name__)
+
+# Brotli is only advertised when it can be decoded.
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+def decompress(body: bytes, encoding: Optional[str]) -> bytes:
+    if not encoding or not body:
+        return body
+
+    # Encodings are listed in the order they were applied.
+    for coding in reversed(encoding.lower().split(",")):
+        coding = coding.strip()
+        if coding in ("gzip", "x-gzip"):
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif coding == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        elif coding == "br" and brotli is not None:
+            body = brotli.decompress(body)
+
+    return body
+
+
+def create_aiohttp_closed_event(session) -> asyncio.Event:
+    """Work around aiohttp issue that doesn't properly close transports on exit.
+
+    See https://github.com/aio-libs/aiohttp/issues/1925#issuecomment-639080209
+
+    Returns:
+       An event that will be set once all transports have been properly closed.
+    """
+
+    transports = 0
+    all_is_lost = asyncio.Event()
+
+    def connection_lost(exc, orig_lost):
+        nonlocal transports
+
+        try:
+            orig_lost(exc)
+        finally:
+            transports -= 1
+            if transports == 0:
+                all_is_lost.set()
+
+    def eof_received(orig_eof_received):
+        try:
+            orig_eof_received()
+        except AttributeError:
+            # It may happen that eof_received() is called after
+            # _app_protocol and _transport are set to None.
+            pass
+
+    for conn in session.connector._conns.values():
+        for handler, _ in conn:
+            proto = getattr(handler.transport, "_ssl_protocol", None)
+            if proto is None:
+                continue
+
+            transports += 1
+            orig_lost = proto.connection_lost
+            orig_eof_received = proto.eof_received
+
+            proto.connection_lost = functools.partial(
+                connection_lost, orig_lost=orig_lost
+            )
+            proto.eof_received = functools.partial(
+                eof_received, orig_eof_received=orig_eof_received
+            )
+
+    if transports == 0:
+        all_is_lost.set()
+
+    return all_is_lost
+
+
+def decode_body(response: Any, body: bytes) -> Any:
+    if "application/json" in response.headers.get("content-type", ""):
+        return codec.loads(body)
+    return body.decode("utf-8")
+
+
+async def json_or_text(response: Any) -> Any:
+    return decode_body(response, await response.read())
+
+
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r]*")
+
+_json_decoder = json.JSONDecoder()
+
+
+def _skip(doc: str, idx: int) -> int:
+    return WHITESPACE_PATTERN.match(doc, idx).end()
+
+
+def _parse_json(doc: str, idx: int, depth: int) -> Generator[None, None, tuple]:
+    # Containers down to max depth are walked here so that the loop can be
+    # yielded to between their values. Everything deeper is parsed in one
+    # go by the C scanner.
+    idx = _skip(doc, idx)
+    char = doc[idx : idx + 1]
+    if depth <= 0 or char not in ("[", "{"):
+        value, end = _json_decoder.raw_decode(doc, idx)
+        yield
+        return value, end
+
+    is_list = char == "["
+    closing = "]" if is_list else "}"
+    result = [] if is_list else {}
+    idx = _skip(doc, idx + 1)
+    if doc[idx : idx + 1] == closing:
+        return result, idx + 1
+
+    while True:
+        if is_list:
+            value, idx = yield from _parse_json(doc, idx, depth - 1)
+            result.append(value)
+        else:
+            if doc[idx : idx + 1] != '"':
+                raise json.JSONDecodeError(
+                    "Expecting property name enclosed in double quotes", doc, idx
+                )
+
+            key, idx = json.decoder.scanstring(doc, idx + 1)
+            idx = _skip(doc, idx)
+            if doc[idx : idx + 1] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", doc, idx)
+
+            value, idx = yield from _parse_json(doc, idx + 1, depth - 1)
+            result[key] = value
+
+        idx = _skip(doc, idx)
+        char = doc[idx : idx + 1]
+        if char == closing:
+            return result, idx + 1
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", doc, idx)
+
+        idx = _skip(doc, idx + 1)
+
+
+async def loads_incrementally(
+    data: bytes, max_depth: int = 2, slice_time: float = 0.005
+) -> Any:
+    """|coro|
+
+    Decodes json while yielding to the event loop at least every
+    ``slice_time`` seconds. Only the containers down to ``max_depth`` are
+    split up, e.g. the list of a friend list or the entries of a
+    leaderboard, so a single value nested deeper still blocks the loop
+    while it is decoded. Full garbage collections triggered by the many
+    objects created can still block the loop for a moment. This always
+    uses the standard library :mod:`json` module.
+    """
+    doc = data.decode("utf-8") if isinstance(data, bytes) else data
+    parser = _parse_json(doc, 0, max_depth)
+
+    deadline = time.perf_counter() + slice_time
+    try:
+        while True:
+            next(parser)
+            if time.perf_counter() >= deadline:
+                await asyncio.sleep(0)
+                deadline = time.perf_counter() + slice_time
+    except StopIteration as exc:
+        value, end = exc.value
+
+    end = _skip(doc, end)
+    if end != len(doc):
+        raise json.JSONDecodeError("Extra data", doc, end)
+    return value
+
+
+class HTTPTransport:
+    """The interface :class:`HTTPClient` uses to send its requests.
+    Subclass this to send requests some other way than through aiohttp.
+    """
+
+    # Json bodies of at least this many bytes are decoded incrementally.
+    decode_threshold = None
+
+    def set_decode_threshold(self, threshold: Optional[int]) -> None:
+        self.decode_threshold = threshold
+
+    async def decode(self, response: Any, body: bytes) -> Any:
+        """|coro|
+
+        Decodes a response body. Json bodies of at least the decode
+        threshold are decoded with :func:`loads_incrementally()` so that
+        the event loop is yielded to while they are decoded.
+        """
+        threshold = self.decode_threshold
+        if threshold is None or len(body) < threshold:
+            return decode_body(response, body)
+
+        if "application/json" in response.headers.get("content-type", ""):
+            return await loads_incrementally(body)
+        return body.decode("utf-8")
+
+    def create_connection(
+        self,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        cookie_jar: Optional[aiohttp.CookieJar] = None,
+    ) -> None:
+        """Called when the client starts up. ``connector`` is ``None`` if
+        the client should own its own connections.
+        """
+        raise NotImplementedError
+
+    def connection_exists(self) -> bool:
+        raise NotImplementedError
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Tuple[Any, Any]:
+        """|coro|
+
+        Sends a request and returns the response alongside its decoded
+        body. The response must at least have the attributes ``status``,
+        ``headers`` and ``cookies``. If known, the size of the body before
+        and after decompression should be set as the attributes
+        ``compressed_size`` and ``decompressed_size``.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        raise NotImplementedError
+
+
+class AiohttpTransport(HTTPTransport):
+    """The default transport which sends requests through a
+    :class:`aiohttp.ClientSession`.
+
+    gzip and deflate (and br if ``brotli`` is installed) are negotiated
+    explicitly and bodies are decompressed in one go after being read,
+    which also makes the transferred size of every response known.
+    """
+
+    def __init__(self) -> None:
+        self.session = None
+        self._owns_connector = True
+
+    def create_connection(
+        self,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        cookie_jar: Optional[aiohttp.CookieJar] = None,
+    ) -> None:
+        self._owns_connector = connector is None
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            connector_owner=self._owns_connector,
+            cookie_jar=cookie_jar,
+            headers={"Accept-Encoding": ACCEPT_ENCODING},
+            auto_decompress=False,
+        )
+
+    def connection_exists(self) -> bool:
+        return self.session is not None
+
+    async def request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> Tuple[aiohttp.ClientResponse, Any]:
+        async with self.session.request(method, url, **kwargs) as r:
+            compressed = await r.read()
+            body = decompress(compressed, r.headers.get("Content-Encoding"))
+
+            # Makes read() return the decompressed body for later users.
+            r._body = body
+            r.compressed_size = len(compressed)
+            r.decompressed_size = len(body)
+
+            return r, await self.decode(r, body)
+
+    async def close(self) -> None:
+        if self.session is None:
+            return
+
+        # Connections of a connector that is not owned by this client
+        # (e.g. a shared ConnectionPool) stay open after the close.
+        if not self._owns_connector:
+            await self.session.close()
+            return
+
+        event = create_aiohttp_closed_event(self.session)
+        await self.session.close()
+        try:
+            await asyncio.wait_for(event.wait(), timeout=2)
+        except asyncio.TimeoutError:
+            pass
+
+
+class RecordedResponse:
+    """A response served from a cassette by :class:`RecordReplayTransport`.
+    Mimics the parts of :class:`aiohttp.ClientResponse` used by the library.
+    """
+
+    def __init__(self, method: str, url: str, data: dict) -> None:
+        self.method = method
+        self.url = url
+        self.status = data["status"]
+        self.reason = data.get("reason")
+        self.headers = CIMultiDictProxy(CIMultiDict(data["headers"]))
+        self.latency = data["latency"]
+        self._body = data["body"].encode("utf-8")
+        self.decompressed_size = len(self._body)
+        self.compressed_size = data.get("compressed_size", self.decompressed_size)
+
+        self.cookies = SimpleCookie()
+        for value in self.headers.getall("Set-Cookie", ()):
+            self.cookies.load(value)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode("utf-8")
+
+    async def json(self) -> Any:
+        return codec.loads(self._body)
+
+
+class RecordReplayTransport(HTTPTransport):
+    """A transport that records real responses to a cassette file or serves
+    them back from one without touching the network. Useful for running and
+    benchmarking the library offline and deterministically.
+
+    Interactions are matched by method, url and params. Recorded responses
+    to the same request are replayed in the order they were recorded, with
+    the last one being repeated when they run out.
+
+    .. warning::
+
+        Cassettes contain the full response bodies and headers, including
+        any access tokens returned by Epic. Request headers are never
+        recorded.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The path of the cassette. Cassettes are stored as gzipped json lines.
+    mode: :class:`str`
+        ``record`` to send requests through ``transport`` and record them
+        or ``replay`` to serve them from the cassette. Defaults to
+        ``replay``.
+    transport: Optional[:class:`HTTPTransport`]
+        The transport used to send requests while recording. Defaults to
+        :class:`AiohttpTransport`.
+    replay_latency: :class:`bool`
+        Whether replayed responses should wait for the latency they were
+        recorded with. Defaults to ``True``.
+
+    Raises
+    ------
+    ValueError
+        An invalid mode was passed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        *,
+        transport: Optional[HTTPTransport] = None,
+        replay_latency: bool = True,
+    ) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError("mode must be either record or replay")
+
+        self.path = path
+        self.mode = mode
+        self.transport = transport or AiohttpTransport()
+        self.replay_latency = replay_latency
+
+        self._recorded = []
+        self._interactions = None
+        self._connected = False
+
+    @staticmethod
+    def _get_key(method: str, url: str, params: Any) -> str:
+        if params:
+            items = params.items() if isinstance(params, dict) else params
+            params = sorted((str(k), str(v)) for k, v in items)
+        return codec.dumps([method, str(url), params or []])
+
+    def load(self) -> None:
+        """Loads the cassette from disk. This is done automatically on the
+        first replayed request.
+
+        Raises
+        ------
+        FileNotFoundError
+            The cassette does not exist.
+        """
+        interactions = {}
+        with gzip.open(self.path, "rt", encoding="utf-8") as fp:
+            for line in fp:
+                if not line.strip():
+                    continue
+
+                data = codec.loads(line)
+                key = self._get_key(data["method"], data["url"], data["params"])
+                interactions.setdefault(key, deque()).append(data)
+
+        self._interactions = interactions
+
+    def save(self) -> None:
+        """Writes the recorded interactions to the cassette. This is done
+        automatically when the transport is closed.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with gzip.open(self.path, "wt", encoding="utf-8") as fp:
+            for data in self._recorded:
+                fp.write(codec.dumps(data) + "\n")
+
+    def set_decode_threshold(self, threshold: Optional[int]) -> None:
+        super().set_decode_threshold(threshold)
+        self.transport.set_decode_threshold(threshold)
+
+    def create_connection(
+        self,
+        connector: Optional[aiohttp.BaseConnector] = None,
+        cookie_jar: Optional[aiohttp.CookieJar] = None,
+    ) -> None:
+        self._connected = True
+        if self.mode == "record":
+            self.transport.create_connection(connector, cookie_jar)
+
+    def connection_exists(self) -> bool:
+        return self._connected
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Tuple[Any, Any]:
+        if self.mode == "record":
+            return await self._record(method, url, **kwargs)
+        return await self._replay(method, url, **kwargs)
+
+    async def _record(self, method: str, url: str, **kwargs: Any) -> Tuple[Any, Any]:
+        params = kwargs.get("params")
+        if isinstance(params, dict):
+            params = list(params.items())
+
+        started_at = time.monotonic()
+        r, data = await self.transport.request(method, url, **kwargs)
+        body = await r.read()
+
+        self._recorded.append(
+            {
+                "method": method,
+                "url": str(url),
+                "params": params,
+                "status": r.status,
+                "reason": getattr(r, "reason", None),
+                "headers": list(r.headers.items()),
+                "body": body.decode("utf-8", "replace"),
+                "compressed_size": getattr(r, "compressed_size", len(body)),
+                "latency": round(time.monotonic() - started_at, 4),
+            }
+        )
+        return r, data
+
+    async def _replay(self, method: str, url: str, **kwargs: Any) -> Tuple[Any, Any]:
+        if self._interactions is None:
+            self.load()
+
+        key = self._get_key(method, url, kwargs.get("params"))
+        try:
+            recorded = self._interactions[key]
+        except KeyError:
+            raise LookupError(
+                "No recorded response for {0} {1}".format(method, url)
+            ) from None
+
+        data = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        response = RecordedResponse(method, url, data)
+        if self.replay_latency and response.latency > 0:
+            await asyncio.sleep(response.latency)
+
+        log.debug("Replaying {0} {1} ({2.status}).".format(method, url, response))
+        return response, await self.decode(response, await response.read())
+
+    async def close(self) -> None:
+        if self.mode == "record":
+            await self.transport.close()
+            if self._recorded:
+                self.save()
@@ -27,8 +27,10 @@ SOFTWARE.
 import asyncio
 import datetime
 import re
+import time
 
-from typing import Optional
+from collections import deque
+from typing import Optional, Any, Awaitable, Callable, Hashable
 
 uuid_match_comp = re.compile(r"^[a-f0-9]{32}$")
 
@@ -56,6 +58,13 @@ class MaybeLock:
         if self._cleanup:
             self.lock.release()
 
+    def release_when_done(self, future: asyncio.Future) -> None:
+        # Keeps the lock, if acquired, held after the context exits and
+        # releases it once the future is done instead.
+        if self._cleanup:
+            self._cleanup = False
+            future.add_done_callback(lambda _: self.lock.release())
+
 
 class LockEvent(asyncio.Lock):
     def __init__(self) -> None:
@@ -84,6 +93,389 @@ class LockEvent(asyncio.Lock):
             self.priority = 0
 
 
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task that sleeps
+    ``interval`` seconds at a time. A high lag means something is blocking
+    the loop, e.g. decoding a huge response.
+
+    Parameters
+    ----------
+    interval: :class:`float`
+        How often the lag is sampled in seconds. Defaults to ``0.25``.
+    max_samples: :class:`int`
+        The amount of latest samples kept. Defaults to ``240``.
+    """
+
+    def __init__(self, interval: float = 0.25, max_samples: int = 240) -> None:
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        self._task = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started_at - self.interval
+            self.samples.append(max(lag, 0.0))
+
+    def get_stats(self) -> dict:
+        """Returns the ``avg``, ``p99`` and ``max`` lag in seconds of the
+        samples kept.
+
+        Returns
+        -------
+        :class:`dict`
+        """
+        if not self.samples:
+            return {"avg": 0.0, "p99": 0.0, "max": 0.0}
+
+        ordered = sorted(self.samples)
+        count = len(ordered)
+        return {
+            "avg": sum(ordered) / count,
+            "p99": ordered[min(int(count * 0.99), count - 1)],
+            "max": ordered[-1],
+        }
+
+
+class _QueuedHandler:
+    __slots__ = ("event", "coro", "args", "kwargs", "key", "future")
+
+    def __init__(self, event, coro, args, kwargs, key, future) -> None:
+        self.event = event
+        self.coro = coro
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.future = future
+
+
+class EventExecutor:
+    """Runs event handlers with a bound on how many may run at the same
+    time. Handlers that can't run yet are queued per event.
+
+    Parameters
+    ----------
+    max_in_flight: :class:`int`
+        The max amount of handlers running at the same time.
+        Defaults to ``100``.
+    max_in_flight_per_event: Optional[:class:`int`]
+        The max amount of handlers of a single event running at the same
+        time. Defaults to ``None`` which means only ``max_in_flight``
+        applies.
+    max_queued: :class:`int`
+        The max amount of handlers queued per event before ``policy``
+        kicks in. Handlers waiting for another handler with the same key
+        count towards this too. Defaults to ``1000``.
+    policy: :class:`str`
+        What to do when the queue of an event is full.
+
+        - ``block``: Keep queueing and stop reading new XMPP stanzas until
+          there is room again. This is the default.
+        - ``drop_oldest``: Cancel the oldest queued handler of the event.
+        - ``drop_newest``: Cancel the handler that was just submitted.
+    max_samples: :class:`int`
+        The amount of latest handler latencies kept per event.
+        Defaults to ``100``.
+    max_internal_in_flight: Optional[:class:`int`]
+        The max amount of the library's internal XMPP event handlers
+        running at the same time. These run in :attr:`internal`, a
+        separate executor with its own budget that always uses the
+        ``block`` policy, so user handlers can never take the slots that
+        internal handlers need to make progress. Defaults to ``100``.
+
+        .. warning::
+
+            Some internal handlers wait for events dispatched by other
+            internal handlers, e.g. a party member joining. If all
+            internal slots are taken by such handlers, they only make
+            progress once their waits time out after a few seconds, so
+            don't set this too low.
+
+    Attributes
+    ----------
+    internal: Optional[:class:`EventExecutor`]
+        The executor running the internal XMPP event handlers.
+    """
+
+    POLICIES = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(
+        self,
+        max_in_flight: int = 100,
+        max_in_flight_per_event: Optional[int] = None,
+        max_queued: int = 1000,
+        policy: str = "block",
+        max_samples: int = 100,
+        max_internal_in_flight: Optional[int] = 100,
+    ) -> None:
+        if policy not in self.POLICIES:
+            raise ValueError("{0!r} is not a valid policy".format(policy))
+
+        if max_internal_in_flight is not None:
+            self.internal = EventExecutor(
+                max_in_flight=max_internal_in_flight,
+                max_in_flight_per_event=max_in_flight_per_event,
+                max_queued=max_queued,
+                max_samples=max_samples,
+                max_internal_in_flight=None,
+            )
+        else:
+            self.internal = None
+
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_event = max_in_flight_per_event
+        self.max_queued = max_queued
+        self.policy = policy
+        self.max_samples = max_samples
+
+        self.running = 0
+        self._running = {}
+        self._queues = {}
+        self._queued = 0
+        self._dropped = {}
+        self._latencies = {}
+
+        # Keys of handlers that are queued or running. Handlers submitted
+        # with a key that is already taken wait here so that they run in
+        # the order they were submitted.
+        self._keys = {}
+        self._waiting = {}
+        self._capacity = None
+
+    @property
+    def queued(self) -> int:
+        """:class:`int`: The amount of handlers currently queued."""
+        return self._queued + sum(self._waiting.values())
+
+    def _pending(self, event: str) -> int:
+        return len(self._queues.get(event, ())) + self._waiting.get(event, 0)
+
+    def submit(
+        self,
+        event: str,
+        coro: Callable[..., Awaitable[Any]],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        **kwargs: Any,
+    ) -> asyncio.Future:
+        """Schedules a handler to be run.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event the handler belongs to.
+        coro: :ref:`coroutine <coroutine>`
+            The handler.
+        key: Optional[Hashable]
+            If passed, handlers submitted with the same key never run at
+            the same time and run in the order they were submitted.
+
+        Returns
+        -------
+        :class:`asyncio.Future`
+            A future finished with the result of the handler. Cancelled if
+            the handler is dropped.
+        """
+        future = asyncio.get_running_loop().create_future()
+        item = _QueuedHandler(event, coro, args, kwargs, key, future)
+
+        if self._pending(event) >= self.max_queued:
+            if self.policy == "drop_newest":
+                self._drop(item)
+                return future
+            elif self.policy == "drop_oldest":
+                self._drop_oldest(event)
+
+        if key is not None:
+            waiting = self._keys.get(key)
+            if waiting is not None:
+                waiting.append(item)
+                self._waiting[event] = self._waiting.get(event, 0) + 1
+                return future
+            self._keys[key] = deque()
+
+        self._enqueue(item)
+        self._schedule()
+        return future
+
+    def _enqueue(self, item: _QueuedHandler, first: bool = False) -> None:
+        try:
+            queue = self._queues[item.event]
+        except KeyError:
+            queue = self._queues[item.event] = deque()
+
+        if first:
+            queue.appendleft(item)
+        else:
+            queue.append(item)
+        self._queued += 1
+
+    def _drop(self, item: _QueuedHandler) -> None:
+        self._dropped[item.event] = self._dropped.get(item.event, 0) + 1
+        item.future.cancel()
+
+    def _drop_oldest(self, event: str) -> None:
+        queue = self._queues.get(event)
+        if queue:
+            item = queue.popleft()
+            if not queue:
+                del self._queues[event]
+
+            self._queued -= 1
+            self._drop(item)
+            self._release(item)
+            return
+
+        # Everything pending for the event is waiting for its key.
+        for waiting in self._keys.values():
+            for item in waiting:
+                if item.event == event:
+                    waiting.remove(item)
+                    self._unwait(event)
+                    self._drop(item)
+                    return
+
+    def _release(self, item: _QueuedHandler) -> None:
+        if item.key is None:
+            return
+
+        waiting = self._keys[item.key]
+        if waiting:
+            item = waiting.popleft()
+            self._unwait(item.event)
+            self._enqueue(item, first=True)
+        else:
+            del self._keys[item.key]
+
+    def _unwait(self, event: str) -> None:
+        count = self._waiting[event] - 1
+        if count:
+            self._waiting[event] = count
+        else:
+            del self._waiting[event]
+
+    def _schedule(self) -> None:
+        # Start one handler per event at a time and move the event to the
+        # back afterwards so that a busy event can't starve the others.
+        limit = self.max_in_flight_per_event
+        queues = self._queues
+        started = True
+        while started and queues and self.running < self.max_in_flight:
+            started = False
+            for event in tuple(queues):
+                if self.running >= self.max_in_flight:
+                    break
+
+                running = self._running.get(event, 0)
+                if limit is not None and running >= limit:
+                    continue
+
+                queue = queues.pop(event)
+                item = queue.popleft()
+                if queue:
+                    queues[event] = queue
+
+                self._queued -= 1
+                self.running += 1
+                self._running[event] = running + 1
+                asyncio.ensure_future(self._run(item))
+                started = True
+
+        if self._capacity is not None and not self._is_full():
+            self._capacity.set()
+
+    def _is_full(self) -> bool:
+        events = self._queues.keys() | self._waiting.keys()
+        return any(self._pending(event) >= self.max_queued for event in events)
+
+    async def _run(self, item: _QueuedHandler) -> None:
+        started_at = time.perf_counter()
+        try:
+            if not item.future.cancelled():
+                result = await item.coro(*item.args, **item.kwargs)
+                if not item.future.cancelled():
+                    item.future.set_result(result)
+        except asyncio.CancelledError:
+            item.future.cancel()
+            raise
+        except Exception as exc:
+            if not item.future.cancelled():
+                item.future.set_exception(exc)
+        finally:
+            try:
+                samples = self._latencies[item.event]
+            except KeyError:
+                samples = deque(maxlen=self.max_samples)
+                self._latencies[item.event] = samples
+            samples.append(time.perf_counter() - started_at)
+
+            self.running -= 1
+            self._running[item.event] -= 1
+            self._release(item)
+            self._schedule()
+
+    async def wait_for_capacity(self) -> None:
+        """|coro|
+
+        Waits until no event has ``max_queued`` or more handlers queued.
+        Returns immediately unless the policy is ``block``.
+        """
+        if self.internal is not None:
+            await self.internal.wait_for_capacity()
+
+        if self.policy != "block":
+            return
+
+        while self._is_full():
+            if self._capacity is None:
+                self._capacity = asyncio.Event()
+            self._capacity.clear()
+            await self._capacity.wait()
+
+    def get_stats(self) -> dict:
+        """Returns the amount of handlers ``running``, ``queued`` and
+        ``dropped`` in total and per event, together with the ``avg`` and
+        ``max`` handler latency in seconds per event. The stats of
+        :attr:`internal` are included under ``internal``.
+
+        Returns
+        -------
+        :class:`dict`
+        """
+        events = {}
+        names = set(self._running) | set(self._queues) | set(self._waiting)
+        names |= set(self._dropped)
+        for event in names | set(self._latencies):
+            samples = self._latencies.get(event, ())
+            events[event] = {
+                "running": self._running.get(event, 0),
+                "queued": self._pending(event),
+                "dropped": self._dropped.get(event, 0),
+                "avg": sum(samples) / len(samples) if samples else 0.0,
+                "max": max(samples, default=0.0),
+            }
+
+        stats = {
+            "running": self.running,
+            "queued": self.queued,
+            "dropped": sum(self._dropped.values()),
+            "events": events,
+        }
+        if self.internal is not None:
+            stats["internal"] = self.internal.get_stats()
+        return stats
+
+
 def from_iso(iso: str) -> datetime.datetime:
     """Converts an iso formatted string to a
     :class:`datetime.datetime` object
@@ -156,3 +548,12 @@ def is_display_name(value: str) -> bool:
         ``True`` if string is valid else ``False``
     """
     return isinstance(value, str) and 3 <= len(value) <= 16
+
+
+def _id_key(*args: Any) -> Any:
+    # The default key extractor of keyed wait_for()'s.
+    return args[0].id
+
+
+def _presence_friend_id_key(before: Any, after: Any) -> str:
+    return after.friend.id
@@ -26,18 +26,28 @@ SOFTWARE.
 
 import aioxmpp
 import asyncio
-import json
 import logging
 import datetime
 import uuid
 import itertools
 import unicodedata
+import re
 import aiohttp
 
 from xml.etree import ElementTree
-from collections import defaultdict
-from typing import TYPE_CHECKING, Optional, Union, Awaitable, Any, Tuple
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Union,
+    Awaitable,
+    Any,
+    Tuple,
+    List,
+    Iterator,
+)
 
+from . import codec
 from .errors import XMPPError, PartyError, HTTPException
 from .message import FriendMessage, PartyMessage
 from .party import (
@@ -48,7 +58,7 @@ from .party import (
 )
 from .presence import Presence
 from .enums import AwayStatus
-from .utils import to_iso, from_iso
+from .utils import to_iso, from_iso, _presence_friend_id_key
 
 if TYPE_CHECKING:
     from .client import Client
@@ -83,6 +93,10 @@ _member_meta_attrs = (
 )
 
 
+def _muc_member_id_key(member: aioxmpp.muc.Occupant) -> str:
+    return member.direct_jid.localpart
+
+
 def is_RandALCat(c: str) -> bool:
     return unicodedata.bidirectional(c) in ("R", "AL")
 
@@ -98,14 +112,149 @@ class EventContext:
         self.created_at = datetime.datetime.utcnow()
 
 
+class HandlerList:
+    """A list-like view of the handlers of a single event stored in a
+    :class:`ListenerRegistry`.
+    """
+
+    __slots__ = ("_registry", "_event")
+
+    def __init__(self, registry: "ListenerRegistry", event: str) -> None:
+        self._registry = registry
+        self._event = event
+
+    def __repr__(self) -> str:
+        return "<HandlerList event={0!r} handlers={1!r}>".format(
+            self._event, list(self.handlers)
+        )
+
+    def __iter__(self) -> Iterator[Awaitable]:
+        return iter(self.handlers)
+
+    def __len__(self) -> int:
+        return len(self.handlers)
+
+    def __bool__(self) -> bool:
+        return self._event in self._registry
+
+    def __contains__(self, coro: Awaitable) -> bool:
+        return self._registry.has(self._event, coro)
+
+    def __getitem__(self, index: int) -> Awaitable:
+        return self.handlers[index]
+
+    @property
+    def handlers(self) -> tuple:
+        return self._registry.get(self._event)
+
+    def append(self, coro: Awaitable) -> None:
+        self._registry.add(self._event, coro)
+
+    def remove(self, coro: Awaitable) -> None:
+        if not self._registry.remove(self._event, coro):
+            raise ValueError("{0!r} is not a handler of this event".format(coro))
+
+
+class ListenerRegistry:
+    """Stores handlers per event. Adding and removing a handler is O(1)
+    and the handlers of an event are cached as a tuple until they change
+    so dispatching never has to copy them.
+
+    Indexing the registry with an event returns a :class:`HandlerList`
+    so code written for the ``defaultdict(list)`` previously used keeps
+    working. Adding a handler already registered for an event does
+    nothing.
+    """
+
+    __slots__ = ("_handlers", "_tables")
+
+    def __init__(self) -> None:
+        self._handlers = {}
+        self._tables = {}
+
+    def __contains__(self, event: str) -> bool:
+        return event in self._handlers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(tuple(self._handlers))
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def __getitem__(self, event: str) -> HandlerList:
+        return HandlerList(self, event)
+
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(self._handlers)
+
+    def items(self) -> List[Tuple[str, HandlerList]]:
+        return [(event, HandlerList(self, event)) for event in self._handlers]
+
+    def get(self, event: str, default: Any = ()) -> tuple:
+        try:
+            return self._tables[event]
+        except KeyError:
+            handlers = self._handlers.get(event)
+            if handlers is None:
+                return default
+
+            table = self._tables[event] = tuple(handlers)
+            return table
+
+    def has(self, event: str, coro: Awaitable) -> bool:
+        handlers = self._handlers.get(event)
+        return handlers is not None and coro in handlers
+
+    def add(self, event: str, coro: Awaitable) -> bool:
+        handlers = self._handlers.setdefault(event, {})
+        if coro in handlers:
+            return False
+
+        handlers[coro] = None
+        self._tables.pop(event, None)
+        return True
+
+    def remove(self, event: str, coro: Awaitable) -> bool:
+        handlers = self._handlers.get(event)
+        if handlers is None or coro not in handlers:
+            return False
+
+        del handlers[coro]
+        if not handlers:
+            del self._handlers[event]
+        self._tables.pop(event, None)
+        return True
+
+
 class EventDispatcher:
-    listeners = defaultdict(list)
-    presence_listeners = []
+    listeners = ListenerRegistry()
+    presence_listeners = ListenerRegistry()["presence"]
     interactions_enabled = False
 
+    # Events whose handlers must run one at a time and in order for the
+    # same value of the body key, e.g. one party's member updates.
+    ordered_events = {
+        "com.epicgames.social.party.notification.v0.MEMBER_STATE_UPDATED": "party_id",
+    }
+
     @classmethod
     def process_presence(cls, client, *args) -> None:
-        for coro in cls.presence_listeners:
+        presence_filter = client.presence_filter
+        if presence_filter is not None:
+            user_id, platform, type_, status, show = args
+            if not presence_filter.matches(user_id, platform, type_, show):
+                return
+
+        coalescer = client.presence_coalescer
+        if coalescer is not None:
+            coalescer.add(args[0], cls._dispatch_presence, client, *args)
+        else:
+            cls._dispatch_presence(client, *args)
+
+    @classmethod
+    def _dispatch_presence(cls, client, *args) -> None:
+        local = client.xmpp.dispatcher.presence_listeners.handlers
+        for coro in cls.presence_listeners.handlers + local:
             if __name__ == coro.__module__:
                 asyncio.ensure_future(coro(client.xmpp, *args))
             else:
@@ -121,16 +270,44 @@ class EventDispatcher:
 
     @classmethod
     def add_presence_handler(cls, coro: Awaitable) -> None:
-        if coro not in cls.presence_listeners:
-            cls.presence_listeners.append(coro)
+        cls.presence_listeners.append(coro)
 
     @classmethod
     def remove_presence_handler(cls, coro: Awaitable) -> None:
-        cls.presence_listeners = [c for c in cls.presence_listeners if c is not coro]
+        if coro in cls.presence_listeners:
+            cls.presence_listeners.remove(coro)
+
+    @classmethod
+    def has_handler(cls, client: "Client", type_: str) -> bool:
+        return type_ in cls.listeners or type_ in client.xmpp.dispatcher.listeners
+
+    @classmethod
+    def is_unhandled(cls, client: "Client", raw_body: str) -> bool:
+        # Cheaply checks if a raw body can be dropped without decoding it.
+        # Nested objects might have type fields too so the body is only
+        # unhandled if none of the types found have a handler. The event
+        # type usually comes first so handled bodies stop at the first
+        # match.
+        index = raw_body.find('"type"')
+        if index == -1:
+            return not cls.interactions_enabled
+
+        while index != -1:
+            match = EVENT_TYPE_PATTERN.match(raw_body, index)
+            if match is None or cls.has_handler(client, match.group(1)):
+                return False
+            index = raw_body.find('"type"', match.end())
+
+        return True
 
     @classmethod
-    def process_event(cls, client: "Client", raw_body: dict) -> None:
-        body = json.loads(raw_body)
+    def process_event(cls, client: "Client", raw_body: Union[str, dict]) -> None:
+        if isinstance(raw_body, dict):
+            body = raw_body
+        else:
+            if cls.is_unhandled(client, raw_body):
+                return
+            body = codec.loads(raw_body)
 
         type_ = body.get("type")
         if type_ is None:
@@ -139,16 +316,33 @@ class EventDispatcher:
                     cls.process_event(client, interaction)
             return
 
-        log.debug("Received event `{}` with body `{}`".format(type_, body))
+        log.debug("Received event `%s` with body `%s`", type_, body)
+
+        coros = cls.listeners.get(type_)
+        local = client.xmpp.dispatcher.listeners.get(type_)
+        if local:
+            coros += local
+
+        executor = client.event_executor
+        if executor is not None and executor.internal is not None:
+            executor = executor.internal
+
+        key = None
+        if executor is not None and type_ in cls.ordered_events:
+            key = (type_, body.get(cls.ordered_events[type_]))
 
-        coros = cls.listeners.get(type_, [])
         for coro in coros:
             ctx = EventContext(client, body)
 
             if __name__ == coro.__module__:
-                asyncio.ensure_future(coro(client.xmpp, ctx))
+                args = (client.xmpp, ctx)
             else:
-                asyncio.ensure_future(coro(ctx))
+                args = (ctx,)
+
+            if executor is not None:
+                executor.submit(type_, coro, *args, key=key)
+            else:
+                asyncio.ensure_future(coro(*args))
 
     @classmethod
     def event(cls, event: str) -> Awaitable:
@@ -160,36 +354,190 @@ class EventDispatcher:
 
     @classmethod
     def add_event_handler(cls, event: str, coro: Awaitable) -> None:
-        cls.listeners[event].append(coro)
-        log.debug("Added handler for {0} to {1}".format(event, coro))
+        if cls.listeners.add(event, coro):
+            log.debug("Added handler for {0} to {1}".format(event, coro))
 
     @classmethod
     def remove_event_handler(cls, event: str, coro: Awaitable) -> None:
-        handlers = [c for c in cls.listeners[event] if c is not coro]
-        log.debug(
-            "Removed {0} handler(s) for {1}".format(
-                len(cls.listeners[event]) - len(handlers), event
-            )
-        )
-        cls.listeners[event] = handlers
+        if cls.listeners.remove(event, coro):
+            log.debug("Removed handler {0} for {1}".format(coro, event))
+
+
+class ClientEventDispatcher:
+    """Handlers of raw XMPP events and presences registered for a single
+    client. Unlike handlers registered on :class:`EventDispatcher`, which
+    run for the stanzas of every client in the process, these only run
+    for the stanzas of the client they belong to.
+    """
+
+    __slots__ = ("listeners", "presence_listeners")
+
+    def __init__(self) -> None:
+        self.listeners = ListenerRegistry()
+        self.presence_listeners = ListenerRegistry()["presence"]
+
+    def presence(self) -> Awaitable:
+        def decorator(coro: Awaitable) -> Awaitable:
+            self.add_presence_handler(coro)
+            return coro
+
+        return decorator
+
+    def add_presence_handler(self, coro: Awaitable) -> None:
+        self.presence_listeners.append(coro)
+
+    def remove_presence_handler(self, coro: Awaitable) -> None:
+        if coro in self.presence_listeners:
+            self.presence_listeners.remove(coro)
+
+    def event(self, event: str) -> Awaitable:
+        def decorator(coro: Awaitable) -> Awaitable:
+            self.add_event_handler(event, coro)
+            return coro
+
+        return decorator
+
+    def add_event_handler(self, event: str, coro: Awaitable) -> None:
+        self.listeners.add(event, coro)
+
+    def remove_event_handler(self, event: str, coro: Awaitable) -> None:
+        self.listeners.remove(event, coro)
 
 
 # Not really used anymore, but it won't get removed as people might rely on it.
 dispatcher = EventDispatcher()
 
 
+CHILD_PATTERN = re.compile(r"<([\w:.-]+)((?:\s[^<>]*?)?)(?:/>|>([^<]*)</\1\s*>)")
+ATTRIBUTE_PATTERN = re.compile(r"""\s*([\w:.-]+)\s*=\s*(?:"([^"<]*)"|'([^'<]*)')""")
+EVENT_TYPE_PATTERN = re.compile(r'"type"\s*:\s*"([^"\\]*)"')
+ENTITY_PATTERN = re.compile(r"&(?:(lt|gt|amp|quot|apos)|#([0-9]+)|#x([0-9a-fA-F]+));")
+
+_xml_entities = {"lt": "<", "gt": ">", "amp": "&", "quot": '"', "apos": "'"}
+
+
+def _replace_entity(match: "re.Match") -> str:
+    name, dec, hex_ = match.groups()
+    if name is not None:
+        return _xml_entities[name]
+    return chr(int(dec) if dec is not None else int(hex_, 16))
+
+
+def unescape_xml(text: str) -> Optional[str]:
+    if "&" not in text:
+        return text
+
+    if "&#" in text:
+        unescaped = ENTITY_PATTERN.sub(_replace_entity, text)
+        if ENTITY_PATTERN.sub("", text).count("&") > 0:
+            return None
+        return unescaped
+
+    # Plain replaces are a lot faster than a substitution callback. &amp;
+    # must be replaced last to not unescape twice.
+    text = (
+        text.replace("&quot;", '"')
+        .replace("&apos;", "'")
+        .replace("&lt;", "<")
+        .replace("&gt;", ">")
+    )
+
+    # Anything else than &amp; left means an entity we don't know.
+    if text.count("&") != text.count("&amp;"):
+        return None
+    return text.replace("&amp;", "&")
+
+
+def parse_stanza(raw: str, tag: str) -> Optional[Tuple[dict, list]]:
+    """Extracts the attributes and the children (tag and text) of a flat
+    stanza without building a tree. Returns ``None`` for anything unusual
+    like nested children, comments, CDATA or malformed stanzas.
+    """
+    raw = raw.strip()
+    prefix = "<" + tag
+    if not raw.startswith(prefix):
+        return None
+
+    root_end = raw.find(">")
+    if root_end == -1:
+        return None
+
+    raw_attrs = raw[len(prefix) : root_end]
+    closed = raw_attrs.endswith("/")
+    if closed:
+        raw_attrs = raw_attrs[:-1]
+    elif not raw.endswith("</" + tag + ">"):
+        return None
+
+    if raw_attrs and not raw_attrs[0].isspace():
+        return None
+
+    attrs = {}
+    pos = 0
+    for m in ATTRIBUTE_PATTERN.finditer(raw_attrs):
+        if raw_attrs[pos : m.start()].strip():
+            return None
+        pos = m.end()
+
+        value = m.group(2) if m.group(2) is not None else m.group(3)
+        value = unescape_xml(value)
+        if value is None:
+            return None
+        attrs[m.group(1)] = value
+
+    if raw_attrs[pos:].strip():
+        return None
+
+    children = []
+    if closed:
+        if root_end != len(raw) - 1:
+            return None
+        return attrs, children
+
+    end = len(raw) - len(tag) - 3
+    pos = root_end + 1
+    match = CHILD_PATTERN.match
+    while pos < end:
+        if raw[pos].isspace():
+            pos += 1
+            continue
+
+        m = match(raw, pos, end)
+        if m is None:
+            if raw[pos:end].strip():
+                return None
+            break
+
+        text = m.group(3) or None
+        if text is not None:
+            text = unescape_xml(text)
+            if text is None:
+                return None
+
+        children.append((m.group(1), text))
+        pos = m.end()
+
+    return attrs, children
+
+
+def parse_stanza_tree(raw: str) -> Tuple[dict, list]:
+    tree = ElementTree.fromstring(raw)
+    return tree.attrib, [(elem.tag, elem.text) for elem in tree]
+
+
 class XMLProcessor:
     def _process_presence(self, raw: str) -> Optional[Union[tuple, bool]]:
-        tree = ElementTree.fromstring(raw)
+        parsed = parse_stanza(raw, "presence")
+        attrs, children = parsed or parse_stanza_tree(raw)
 
-        type_ = tree.get("type")
+        type_ = attrs.get("type")
 
         # Only intercept presences with either no type attribute
         # (which means available) or unavailable type.
         if type_ is not None and type_ not in ("available", "unavailable"):
             return False
 
-        from_ = tree.get("from")
+        from_ = attrs.get("from")
 
         # If from is a party, let aioxmpp handle it.
         if from_ is not None and "-" in from_:
@@ -197,11 +545,11 @@ class XMLProcessor:
 
         status = None
         show = None
-        for elem in tree:
-            if "status" in elem.tag:
-                status = elem.text
-            if "show" in elem.tag:
-                show = elem.text
+        for tag, text in children:
+            if "status" in tag:
+                status = text
+            if "show" in tag:
+                show = text
 
         # We have no use for the presence if status is None and
         # therefore it's better to just let aioxmpp handle it.
@@ -215,13 +563,14 @@ class XMLProcessor:
         return "presence", (user_id, platform, type_, status, show)
 
     def _process_message(self, raw: str) -> Optional[Union[tuple, bool]]:
-        tree = ElementTree.fromstring(raw)
+        parsed = parse_stanza(raw, "message")
+        attrs, children = parsed or parse_stanza_tree(raw)
 
         # Only intercept messages sent by epic
-        if tree.get("from", "") != "xmpp-admin@prod.ol.epicgames.com":
+        if attrs.get("from", "") != "xmpp-admin@prod.ol.epicgames.com":
             return False
 
-        type_ = tree.get("type")
+        type_ = attrs.get("type")
 
         # Only intercept messages with either no type attribute
         # (which means normal) or  type.
@@ -232,9 +581,9 @@ class XMLProcessor:
         # a message can include multiple body tags for different languages
         # but afaik only one body tag is sent from epics servers.
         body = None
-        for elem in tree:
-            if "body" in elem.tag:
-                body = elem.text
+        for tag, text in children:
+            if "body" in tag:
+                body = text
                 break
         else:
             return False
@@ -267,8 +616,18 @@ class WebsocketTransport:
 
         self.xml_processor = XMLProcessor()
 
+        self.max_queued = client.xmpp_write_queue_size
+        self.coalesce_stanzas = client.xmpp_coalesce_stanzas
+
         self.connection = None
-        self._buffer = b""
+        self._buffer = []
+        self._queue = deque()
+        self._queued_bytes = 0
+        self._queue_event = asyncio.Event()
+        self._writable_event = asyncio.Event()
+        self._writable_event.set()
+        self._writer_task = None
+        self._closing = False
         self._reader_task = None
         self._close_event = asyncio.Event()
         self._called_lost = False
@@ -286,6 +645,7 @@ class WebsocketTransport:
         self.connection = con = await self.session.ws_connect(*args, **kwargs)
 
         asyncio.create_task(self.reader())
+        self._writer_task = asyncio.create_task(self.writer())
         self.stream.connection_made(self)
         self._called_lost = False
         self._attempt_reconnect = True
@@ -300,8 +660,13 @@ class WebsocketTransport:
             while True:
                 msg = await self.connection.receive()
 
-                self.logger.debug("RECV: {0}".format(msg))
+                self.logger.debug("RECV: %s", msg)
                 if msg.type == aiohttp.WSMsgType.TEXT:
+                    # Stop reading while the event handlers can't keep up.
+                    executor = self.client.event_executor
+                    if executor is not None:
+                        await executor.wait_for_capacity()
+
                     ret = self.xml_processor.process(msg.data)
                     if ret is None:
                         continue
@@ -322,6 +687,7 @@ class WebsocketTransport:
 
                     if not self._called_lost:
                         self._called_lost = True
+                        self._stop_writer()
                         self.stream.connection_lost(err)
                         self._close_session()
 
@@ -330,6 +696,7 @@ class WebsocketTransport:
                 if msg.type == aiohttp.WSMsgType.ERROR:
                     if not self._called_lost:
                         self._called_lost = True
+                        self._stop_writer()
                         self.stream.connection_lost(
                             ConnectionError(
                                 "websocket stream received an error: {0}".format(
@@ -342,17 +709,99 @@ class WebsocketTransport:
             self.logger.debug("Websocket reader stopped.")
 
     async def send(self, data: bytes) -> None:
-        self.logger.debug("SEND: {0}".format(data))
+        self.logger.debug("SEND: %s", data)
         await self.connection.send_bytes(data)
 
+    @property
+    def queued_bytes(self) -> int:
+        return self._queued_bytes
+
+    def _update_writable(self) -> None:
+        if self._closing or len(self._queue) < self.max_queued:
+            self._writable_event.set()
+        else:
+            self._writable_event.clear()
+
+    async def writer(self) -> None:
+        # The only task sending data so frames are always sent in the
+        # order they were flushed.
+        queue = self._queue
+        try:
+            while True:
+                if not queue:
+                    if self._closing:
+                        break
+
+                    self._queue_event.clear()
+                    await self._queue_event.wait()
+                    continue
+
+                # With the legacy framing used by epic, frames are just
+                # chunks of one xml stream so stanzas can be joined.
+                if self.coalesce_stanzas:
+                    data = b"".join(queue)
+                    queue.clear()
+                else:
+                    data = queue.popleft()
+
+                self._update_writable()
+                await self.send(data)
+                self._queued_bytes = max(self._queued_bytes - len(data), 0)
+        except Exception as exc:
+            self.logger.debug("Websocket writer failed: %s", exc)
+
+            # Let the stream know so that it reconnects instead of every
+            # later stanza being dropped.
+            if not self._called_lost:
+                self._called_lost = True
+                self._stop_writer()
+                self.stream.connection_lost(
+                    ConnectionError(
+                        "websocket stream failed to send: {0}".format(exc)
+                    )
+                )
+                asyncio.create_task(
+                    self._abort_connection(self.connection, self.session)
+                )
+        finally:
+            queue.clear()
+            self._queued_bytes = 0
+            self._closing = True
+            self._writable_event.set()
+            self.logger.debug("Websocket writer stopped.")
+
+    async def wait_writable(self) -> None:
+        """Waits until the write queue has room for more stanzas."""
+        while not self._writable_event.is_set():
+            await self._writable_event.wait()
+
+    def _stop_writer(self) -> None:
+        # The connection is gone so nothing queued can be sent anymore.
+        self._closing = True
+        self._queue.clear()
+        self._queued_bytes = 0
+        self._queue_event.set()
+        self._writable_event.set()
+
     def write(self, data: bytes) -> None:
-        self._buffer += data
+        # Nothing would ever send data written after the writer was told
+        # to stop, so it's dropped.
+        if not self._closing:
+            self._buffer.append(data)
 
     def flush(self) -> None:
+        if self._closing:
+            self._buffer = []
+            return
+
         if self._buffer:
-            asyncio.ensure_future(self.send(self._buffer))
+            data = b"".join(self._buffer)
+            self._buffer = []
 
-        self._buffer = b""
+            self._queue.append(data)
+            self._queued_bytes += len(data)
+            self._queue_event.set()
+            self._update_writable()
 
     def can_write_eof(self) -> bool:
         return False
@@ -384,11 +833,38 @@ class WebsocketTransport:
 
         self.logger.debug("Closing websocket connection.")
 
-        task = asyncio.create_task(self.connection.close())
+        task = asyncio.create_task(self._close_connection())
         task.add_done_callback(self.on_close)
 
         self._stop_reader()
 
+    async def _abort_connection(
+        self,
+        connection: aiohttp.ClientWebSocketResponse,
+        session: aiohttp.ClientSession,
+    ) -> None:
+        # Passed in as a reconnect could have replaced them by now. The
+        # reader stops once it receives the close of the connection.
+        try:
+            await connection.close()
+        finally:
+            await session.close()
+
+    async def _close_connection(self) -> None:
+        # Let the writer send what's left, like the stream footer, before
+        # the connection is closed.
+        self._closing = True
+        self._queue_event.set()
+        self._writable_event.set()
+
+        task = self._writer_task
+        if task is not None and not task.done():
+            done, _ = await asyncio.wait((task,), timeout=5)
+            if not done:
+                task.cancel()
+
+        await self.connection.close()
+
     def close(self) -> None:
         self._attempt_reconnect = False
         self._close()
@@ -505,6 +981,7 @@ class XMPPOverWebsocketConnector(aioxmpp.connector.BaseConnector):
         transport = WebsocketTransport(
             stream, self.client, logger, ws_connector=self.ws_connector
         )
+        self.client.xmpp.transport = transport
         await transport.create_connection(
             "wss://{host}".format(host=host),
             protocols=("xmpp",),
@@ -603,6 +1080,19 @@ class XMPPClient:
         self._task = None
 
         self.send_presence_on_add = True
+        self.dispatcher = ClientEventDispatcher()
+        self.transport = None
+
+    @property
+    def queued_bytes(self) -> int:
+        """The amount of bytes waiting to be sent over the websocket."""
+        if self.transport is None:
+            return 0
+        return self.transport.queued_bytes
+
+    async def wait_writable(self) -> None:
+        if self.transport is not None:
+            await self.transport.wait_writable()
 
     def jid(self, user_id: str) -> aioxmpp.JID:
         return aioxmpp.JID.fromstr("{}@{}".format(user_id, self.client.service_host))
@@ -645,7 +1135,7 @@ class XMPPClient:
         }
 
         if "Platform_j" in member_m:
-            meta["Platform_j"] = json.loads(member_m["Platform_j"])["Platform"][
+            meta["Platform_j"] = codec.loads(member_m["Platform_j"])["Platform"][
                 "platformStr"
             ]
 
@@ -670,7 +1160,7 @@ class XMPPClient:
         if author is None:
             try:
                 author = await self.client.wait_for(
-                    "friend_add", check=lambda f: f.id == user_id, timeout=2
+                    "friend_add", key=user_id, timeout=2
                 )
             except asyncio.TimeoutError:
                 log.debug("Friend message discarded because friend not found.")
@@ -943,11 +1433,12 @@ class XMPPClient:
             if member.id == self.client.user.id:
                 await self.client.wait_for("muc_enter", timeout=2)
             else:
-
-                def check(m):
-                    return m.direct_jid.localpart == member.id
-
-                await self.client.wait_for("muc_member_join", check=check, timeout=2)
+                await self.client.wait_for(
+                    "muc_member_join",
+                    key=member.id,
+                    key_extractor=_muc_member_id_key,
+                    timeout=2,
+                )
         except asyncio.TimeoutError:
             pass
 
@@ -961,7 +1452,7 @@ class XMPPClient:
                 try:
                     await self.client.wait_for(
                         "internal_initial_party_member_meta",
-                        check=lambda m: m.id == member.id,
+                        key=member.id,
                         timeout=2,
                     )
                 except asyncio.TimeoutError:
@@ -1212,12 +1703,9 @@ class XMPPClient:
         member = party.get_member(user_id)
         if member is None:
 
-            def check(m):
-                return m.id == user_id
-
             try:
                 member = await self.client.wait_for(
-                    "internal_party_member_join", check=check, timeout=1
+                    "internal_party_member_join", key=user_id, timeout=1
                 )
             except asyncio.TimeoutError:
                 party_data = await self.client.http.party_lookup(party.id)
@@ -1262,7 +1750,7 @@ class XMPPClient:
                 "Default:MemberSquadAssignmentRequest_j"
             )
             if req_j is not None:
-                req = json.loads(req_j)["MemberSquadAssignmentRequest"]
+                req = codec.loads(req_j)["MemberSquadAssignmentRequest"]
                 version = req.get("version")
 
                 if member.id == self.client.user.id:
@@ -1404,8 +1892,16 @@ class XMPPClient:
     async def process_presence(
         self, user_id: str, platform: str, type_: str, status: str, show: str
     ) -> None:
+        client = self.client
+        if client.skip_unobserved_presences and not client._event_has_destination(
+            "friend_presence"
+        ):
+            # Don't keep a presence around that will never be updated.
+            client._presences.pop(user_id, None)
+            return
+
         try:
-            data = json.loads(status)
+            data = codec.loads(status)
 
             ch = data.get("Status", "") != ""
 
@@ -1419,7 +1915,7 @@ class XMPPClient:
         if friend is None:
             try:
                 friend = await self.client.wait_for(
-                    "friend_add", check=lambda f: f.id == user_id, timeout=1
+                    "friend_add", key=user_id, timeout=1
                 )
             except asyncio.TimeoutError:
                 return
@@ -1552,6 +2048,25 @@ class XMPPClient:
             # never receive a result.
             await self.client.loop.create_future()
 
+    async def prewarm(self, *, timeout: float = 5) -> None:
+        # Only useful with a shared connector as the connection must
+        # outlive this session to be reused by the websocket.
+        if self.ws_connector is None:
+            return
+
+        url = "https://{0}".format(self.client.service_domain)
+        session = aiohttp.ClientSession(
+            connector=self.ws_connector,
+            connector_owner=False,
+        )
+        try:
+            async with session.head(url, timeout=aiohttp.ClientTimeout(total=timeout)):
+                pass
+        except Exception as exc:
+            log.debug("Failed to prewarm {0}: {1!r}".format(url, exc))
+        finally:
+            await session.close()
+
     async def run(self) -> None:
         resource_id = (uuid.uuid4().hex).upper()
         resource = "V2:Fortnite:{0.client.platform.value}::{1}".format(
@@ -1704,6 +2219,8 @@ class XMPPClient:
             type_=aioxmpp.MessageType.CHAT,
         )
         msg.body[None] = content
+
+        await self.wait_writable()
         await self.stream.send(msg)
 
     def set_presence(
@@ -1715,7 +2232,7 @@ class XMPPClient:
         _status = status if isinstance(status, dict) else {"Status": status}
         self.xmpp_client.set_presence(
             state=aioxmpp.PresenceState(available=True, show=show),
-            status=json.dumps(_status),
+            status=codec.dumps(_status),
         )
 
     async def send_presence(
@@ -1741,13 +2258,17 @@ class XMPPClient:
         )
 
         if _status is not None:
-            pres.status[None] = json.dumps(_status)
+            pres.status[None] = codec.dumps(_status)
+
+        await self.wait_writable()
         await self.stream.send(pres)
 
     async def get_presence(self, jid: aioxmpp.JID) -> Presence:
         self.client.loop.create_task(self.send_presence_probe(jid))
         _, after = await self.client.wait_for(
-            "friend_presence", check=lambda b, a: a.friend.id == jid.localpart
+            "friend_presence",
+            key=jid.localpart,
+            key_extractor=_presence_friend_id_key,
         )
         return after
 